@@ -4,35 +4,269 @@ Based on groxaxo/parakeet-tdt-0.6b-v3-fastapi-openai with security hardening:
 - Removed double model load (GPU path was broken, kept clean CPU-only path)
 - Removed webbrowser.open_new_tab() (no display server in Docker)
 - Removed hardcoded developer IP from OpenAPI spec
-- Lowered MAX_CONTENT_LENGTH from 2GB to 100MB
+- Lowered MAX_CONTENT_LENGTH from 2GB to MAX_UPLOAD_MB
 - Stripped unused imports (openai, requests, typing_extensions)
-- Set 8 intra-op threads for i7-13700 P-cores
+- Size thread pools from the container's CPU quota and affinity
 """
 
 host = "0.0.0.0"
 port = 5092
-threads = 8
+# Waitress threads; None sizes the pool from the CPUs available to the
+# container (see available_cpus). Override with PARAKEET_HTTP_THREADS.
+threads = None
+
+MODEL_NAME = "nemo-parakeet-tdt-0.6b-v3"
+QUANTIZATION = "int8"
 
 CHUNK_MINUTE = 1.0
 SILENCE_THRESHOLD = "-40dB"
 SILENCE_MIN_DURATION = 0.5
 SILENCE_SEARCH_WINDOW = 30.0
-SILENCE_DETECT_TIMEOUT = 300
+SILENCE_FRAME_SECONDS = 0.01
 MIN_SPLIT_GAP = 5.0
 
+# Overlapped chunking: each chunk's audio runs half of CHUNK_OVERLAP_SECONDS
+# past both of its split points, so a word cut by a split is heard whole by
+# one of the two chunks. Their transcripts switch over at the longest pause
+# between words near the split, or the split itself, so each word is kept
+# once. This makes short chunks usable for faster first results, e.g.
+# PARAKEET_CHUNK_SECONDS=15 with PARAKEET_CHUNK_OVERLAP=2; the silence search
+# and minimum chunk length shrink with the chunk. The overlap is capped at
+# half the chunk length; 0 disables it.
+CHUNK_OVERLAP_SECONDS = 0.0
+
+# Speech gating: non-speech spans longer than VAD_MIN_SILENCE, found with the
+# same level detector as split points, are cut out of each chunk before
+# recognition, keeping VAD_PADDING of quiet either side of the speech. Token
+# timestamps are mapped back onto the original timeline. Enable with
+# PARAKEET_VAD_GATING=1.
+VAD_GATING = False
+VAD_THRESHOLD = SILENCE_THRESHOLD
+VAD_MIN_SILENCE = 1.0
+VAD_PADDING = 0.25
+
+# Output segments are sentences: a segment ends after a word ending in . ? or
+# !, before a pause longer than SEGMENT_MAX_GAP, or once it has run
+# SEGMENT_MAX_SECONDS, so subtitles stay readable. Tokens carry only start
+# times; a chunk's last token is given one TOKEN_FRAME_SECONDS encoder frame.
+SEGMENT_MAX_GAP = 1.5
+SEGMENT_MAX_SECONDS = 15.0
+TOKEN_FRAME_SECONDS = 0.08
+
+SAMPLE_RATE = 16000
+# Raw PCM skips ffmpeg: a request body sent as audio/L16;rate=N or
+# audio/pcm;encoding=f32le;rate=N;channels=C, or a multipart file with
+# encoding and sample_rate fields, is downmixed and resampled in-process.
+# Both encodings are little-endian, as browsers and most hosts produce them.
+# Raw PCM is held and resampled whole, so it is capped at PCM_MAX_MB (about
+# 30 minutes of 16 kHz PCM16); longer audio should be sent encoded, which
+# goes through the bounded windowed decode.
+PCM_ENCODINGS = {"s16le": "<i2", "f32le": "<f4"}
+PCM_MIMETYPES = ("audio/l16", "audio/pcm")
+PCM_MAX_MB = 64
+# Pipe uploads through ffmpeg and hand PCM to the model in memory. Set to
+# False to save the upload and decode it to a memory-mapped raw PCM file.
+PIPE_DECODE = True
+PIPE_BUFFER_SIZE = 64 * 1024
+# Containers whose index may sit at the end of the file (moov atom) cannot be
+# demuxed from a non-seekable pipe, so they are spooled to disk first.
+SEEKABLE_EXTENSIONS = {".mp4", ".m4a", ".mov"}
+
+# Long uploads: audio running past WINDOWED_MIN_SECONDS is decoded and
+# transcribed one window at a time instead of as a whole. Each split is still
+# the silence nearest the CHUNK_SECONDS target within SILENCE_SEARCH_WINDOW,
+# so only one window of PCM plus at most WINDOWED_MAX_INFLIGHT_CHUNKS chunks
+# awaiting recognition are resident, however long the file is. Applies with
+# PIPE_DECODE; the disk path memory-maps the whole decode instead.
+WINDOWED_MIN_SECONDS = 600.0
+WINDOWED_MAX_INFLIGHT_CHUNKS = 8
+# Upload size limit. Uploads are spooled to a temp file, not held in memory,
+# and windowed decoding keeps long audio bounded, so this mostly caps temp
+# disk. Override with PARAKEET_MAX_UPLOAD_MB.
+MAX_UPLOAD_MB = 512
+
+# Micro-batching: chunks from concurrent requests that arrive within
+# BATCH_WINDOW_MS of each other share one recognize() call. Chunks more than
+# BATCH_MAX_PAD_RATIO times longer or shorter than the oldest pending chunk
+# wait for a later batch so short clips are not padded to an hour-long chunk.
+# Override with PARAKEET_BATCH_WINDOW_MS and PARAKEET_BATCH_MAX_SIZE.
+BATCH_WINDOW_MS = 15
+BATCH_MAX_SIZE = 4
+BATCH_MAX_PAD_RATIO = 2.0
+
+# Inference pool layout as WORKERSxTHREADS: each worker owns its own ORT
+# session with THREADS intra-op threads and pulls batches independently, so a
+# long file's chunks fan out across workers. Every worker holds a full copy
+# of the weights (~0.7 GB for INT8). None runs one worker with a thread per
+# available CPU. Override with PARAKEET_INFERENCE_LAYOUT, e.g. 1x8, 2x4 or 4x2
+# on an 8-CPU container.
+INFERENCE_LAYOUT = None
+
+# Pre-fork serving: when > 0, this process only handles HTTP and dispatches
+# batches to WORKER_PROCESSES inference processes. A single-threaded
+# supervisor loads the model once and forks the workers from it, so the
+# weights are shared copy-on-write and a crashed worker is re-forked without
+# reloading. Workers run single-threaded sessions (ORT thread pools do not
+# survive fork); parallelism comes from the process count. Override with
+# PARAKEET_WORKER_PROCESSES. An idle connection is checked every
+# WORKER_POLL_SECONDS, so a crashed worker is detached without waiting for a
+# batch to fail on it.
+WORKER_PROCESSES = 0
+WORKER_MAX_ATTEMPTS = 2
+WORKER_POLL_SECONDS = 1.0
+
+# Autotune: with PARAKEET_AUTOTUNE=on, the first start on a host benchmarks
+# the inference layouts that fit its CPU budget, each at several batch sizes,
+# on a synthesized voiced sample (AUTOTUNE_SAMPLE names its generator; noise
+# would leave the TDT decoder idle and tune for the encoder alone), and stores
+# the winner in AUTOTUNE_FILE keyed by the sample, CPU quota, affinity, CPU
+# model and ORT version; later starts reuse it.
+# PARAKEET_AUTOTUNE=force re-runs the benchmark. The fastest configuration
+# whose single-clip latency is within AUTOTUNE_LATENCY_SLACK of the best wins.
+# Explicit PARAKEET_* overrides always take precedence over tuned values.
+# Autotune sizes the in-process pool; pre-fork mode runs one single-threaded
+# session per process and is not tuned.
+AUTOTUNE = "off"
+AUTOTUNE_FILE = "models/autotune.json"
+AUTOTUNE_BATCH_SIZES = (1, 2, 4, 8)
+AUTOTUNE_CHUNK_SECONDS = 10.0
+AUTOTUNE_CHUNKS = 16
+AUTOTUNE_LATENCY_SLACK = 1.5
+AUTOTUNE_SAMPLE = "voiced-1"  # bump whenever synthetic_audio changes
+# (F1, F2, F3) in Hz of the vowels synthetic_audio voices.
+VOWEL_FORMANTS = ((730, 1090, 2440), (270, 2290, 3010), (300, 870, 2240),
+                  (530, 1840, 2480), (570, 840, 2410))
+
+# Cold start: ORT's optimized graph for each model file is saved under
+# GRAPH_CACHE_DIR on the models volume (override with
+# PARAKEET_GRAPH_CACHE_DIR, or set it empty to disable) and reused on later
+# starts instead of re-running ORT_ENABLE_ALL optimization. ORT_ENABLE_ALL
+# output is hardware specific, so the cache is keyed on the ORT version and
+# CPU flags. Every session then recognizes WARMUP_SECONDS of synthetic audio
+# before it takes traffic. The model loads in the background: /health/live
+# answers at once, /health/ready once a warmed worker is attached.
+GRAPH_CACHE_DIR = "models/ort-cache"
+WARMUP_SECONDS = 5.0
+
+# On-demand profiling, off unless PARAKEET_PROFILE_TOKEN is set; every
+# profiling request must then send it as "Authorization: Bearer <token>".
+# POST /debug/profile with requests=N traces the next N transcription requests
+# (a single request can ask with ?profile=1), and with inferences=N runs the
+# next N batches on a separately loaded model that has ONNX Runtime's operator
+# profiler on (in-process inference only). That model is dropped once its
+# profile is written, or after PROFILE_ARM_TIMEOUT_SECONDS if fewer batches
+# came. Both write Chrome trace-event JSON to PROFILE_DIR (override with
+# PARAKEET_PROFILE_DIR), listed at GET /debug/profile, downloadable from
+# /debug/profile/<name> and viewable in Perfetto or chrome://tracing; the
+# newest PROFILE_MAX_ARTIFACTS are kept. While nothing is armed, the hot path
+# only checks a flag.
+PROFILE_DIR = "models/profiles"
+PROFILE_MAX_REQUESTS = 100
+PROFILE_MAX_INFERENCES = 50
+PROFILE_MAX_ARTIFACTS = 50
+PROFILE_ARM_TIMEOUT_SECONDS = 600
+
+# Admission control: clips up to INTERACTIVE_MAX_SECONDS long, or requests
+# sent with priority=interactive, are scheduled ahead of bulk jobs at chunk
+# granularity. Requests beyond the in-flight limits or the per-class chunk
+# queue bounds are answered with 503 and a Retry-After estimate. None derives
+# the in-flight limits from the waitress thread count. Override with
+# PARAKEET_MAX_INFLIGHT_REQUESTS and PARAKEET_BULK_MAX_INFLIGHT.
+INTERACTIVE_MAX_SECONDS = 30.0
+MAX_INFLIGHT_REQUESTS = None
+BULK_MAX_INFLIGHT = None
+MAX_QUEUED_CHUNKS = {"interactive": 32, "bulk": 256}
+
+# Realtime streaming over WebSocket. waitress cannot upgrade connections, so
+# the endpoint listens on its own port. The live window is re-recognized
+# every STREAM_STEP_SECONDS of new audio and force-committed once it grows
+# past STREAM_MAX_WINDOW_SECONDS. PCM at 16 kHz is used as-is; other rates
+# and containerized Opus (MediaRecorder WebM/Ogg) go through ffmpeg.
+STREAM_PORT = 5093
+STREAM_PATH = "/v1/audio/transcriptions/stream"
+STREAM_STEP_SECONDS = 1.0
+STREAM_MAX_WINDOW_SECONDS = 20.0
+STREAM_MIN_SAMPLES = 1600
+STREAM_MAX_SESSIONS = 4
+STREAM_FORMATS = {
+    "pcm_s16le": ["-f", "s16le"],
+    "pcm_f32le": ["-f", "f32le"],
+    "webm": ["-f", "matroska"],
+    "ogg": ["-f", "ogg"],
+}
+
+# Asynchronous jobs: uploads submitted to /v1/audio/transcriptions/jobs are
+# spooled under JOB_SPOOL_DIR (override with PARAKEET_JOB_DIR) and transcribed
+# by JOB_WORKERS background threads (override with PARAKEET_JOB_WORKERS), so
+# they hold no HTTP thread and queued jobs survive a restart. Finished jobs are kept for JOB_TTL seconds, at most
+# MAX_FINISHED_JOBS of them, and their stored results are capped at
+# MAX_RESULT_BYTES; the oldest are evicted first.
+JOB_SPOOL_DIR = "models/jobs"
+JOB_WORKERS = 2
+MAX_QUEUED_JOBS = 64
+JOB_TTL = 3600
+MAX_FINISHED_JOBS = 1000
+MAX_RESULT_BYTES = 64 * 1024 * 1024
+
+# Bulk mode: `python app.py bulk DIR|MANIFEST [--formats txt,srt]` transcribes
+# every audio file under a directory (or listed in a manifest) at bulk
+# priority and writes <file>.<format> (talk.wav.srt) next to each input, via
+# a temp file and rename; inputs whose outputs all exist are skipped, so a
+# rerun resumes an interrupted one. BULK_FILES files are in flight at once (None: enough to
+# fill a batch; override with PARAKEET_BULK_FILES) so short files share
+# batches. POST /v1/audio/transcriptions/bulk queues up to MAX_BULK_FILES
+# uploads as jobs in one request.
+BULK_FORMATS = {"txt": "text", "srt": "srt", "vtt": "vtt", "json": "verbose_json"}
+BULK_FILES = None
+MAX_BULK_FILES = 32
+
+# Transcript cache keyed on the SHA-256 of the uploaded bytes plus model and
+# quantization, so retried uploads and replayed messages skip decoding and
+# inference. Entries hold raw segments and words and serve every
+# response_format. Up to CACHE_MEMORY_BYTES stay in memory (LRU). The disk
+# tier keeps dictated text across restarts, so it is off unless
+# PARAKEET_CACHE_DISK_MB is set; entries then also go to CACHE_DIR on the
+# models volume (override with PARAKEET_CACHE_DIR) and are deleted once unused
+# for CACHE_DISK_MAX_AGE_HOURS (override with PARAKEET_CACHE_DISK_MAX_AGE_HOURS).
+CACHE_MEMORY_BYTES = 64 * 1024 * 1024
+CACHE_DIR = "models/transcripts"
+CACHE_DISK_MB = 0
+CACHE_DISK_MAX_AGE_HOURS = 24 * 7
+# Leftover *.tmp cache writes are only deleted once this old; a bulk CLI or
+# second server sharing the directory may still be writing younger ones.
+CACHE_TEMP_GRACE_SECONDS = 3600
+
 import sys
 
 sys.stdout = sys.stderr
 
+import argparse
+import bisect
+import collections
+import concurrent.futures
+import contextlib
 import datetime
+import functools
+import gc
+import hashlib
+import hmac
+import io
 import json
 import math
+import multiprocessing.connection
 import os
+import platform
+import queue
 import re
+import shutil
 import subprocess
+import tempfile
+import threading
 import time
+import urllib.parse
 import uuid
 
+import numpy as np
 import psutil
 from werkzeug.utils import secure_filename
 
@@ -46,110 +280,1688 @@ os.environ["HF_HOME"] = ROOT_DIR + "/models"
 os.environ["HF_HUB_CACHE"] = ROOT_DIR + "/models"
 os.environ["HF_HUB_DISABLE_SYMLINKS_WARNING"] = "true"
 
-try:
-    print("\nLoading Parakeet TDT 0.6B V3 ONNX model with INT8 quantization...")
-    import onnx_asr
+
+def cgroup_cpu_quota():
+    """CPU quota of this process's cgroup as a (fractional) CPU count, or None."""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    for base in ("/sys/fs/cgroup/cpu", "/sys/fs/cgroup/cpu,cpuacct"):
+        try:
+            with open(f"{base}/cpu.cfs_quota_us") as f:
+                quota = int(f.read())
+            with open(f"{base}/cpu.cfs_period_us") as f:
+                period = int(f.read())
+        except (OSError, ValueError):
+            continue
+        return quota / period if quota > 0 else None
+    return None
+
+
+def available_cpus():
+    """CPUs this process can actually use: its affinity, capped by the cgroup quota.
+
+    os.cpu_count() reports the host's CPUs, so a container limited to a few
+    of them would otherwise oversubscribe itself and get throttled.
+    """
+    try:
+        affinity = len(os.sched_getaffinity(0))
+    except AttributeError:
+        affinity = os.cpu_count() or 1
+    quota = cgroup_cpu_quota()
+    available = affinity if quota is None else max(1, min(affinity, int(quota)))
+    return {"affinity": affinity, "quota": quota, "available": available}
+
+
+def env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+TUNING_ENV = ("PARAKEET_HTTP_THREADS", "PARAKEET_INFERENCE_LAYOUT", "PARAKEET_WORKER_PROCESSES",
+              "PARAKEET_BATCH_WINDOW_MS", "PARAKEET_BATCH_MAX_SIZE",
+              "PARAKEET_MAX_INFLIGHT_REQUESTS", "PARAKEET_BULK_MAX_INFLIGHT",
+              "PARAKEET_VAD_GATING", "PARAKEET_JOB_WORKERS", "PARAKEET_BULK_FILES",
+              "PARAKEET_CHUNK_SECONDS", "PARAKEET_CHUNK_OVERLAP")
+
+cpus = available_cpus()
+threads = env_int("PARAKEET_HTTP_THREADS", threads or max(4, cpus["available"]))
+BATCH_WINDOW_MS = env_int("PARAKEET_BATCH_WINDOW_MS", BATCH_WINDOW_MS)
+BATCH_MAX_SIZE = env_int("PARAKEET_BATCH_MAX_SIZE", BATCH_MAX_SIZE)
+VAD_GATING = bool(env_int("PARAKEET_VAD_GATING", VAD_GATING))
+CHUNK_SECONDS = float(os.environ.get("PARAKEET_CHUNK_SECONDS") or CHUNK_MINUTE * 60)
+CHUNK_OVERLAP_SECONDS = min(float(os.environ.get("PARAKEET_CHUNK_OVERLAP") or CHUNK_OVERLAP_SECONDS),
+                            CHUNK_SECONDS / 2)
+MAX_INFLIGHT_REQUESTS = env_int("PARAKEET_MAX_INFLIGHT_REQUESTS",
+                                MAX_INFLIGHT_REQUESTS or threads - 1)
+BULK_MAX_INFLIGHT = env_int("PARAKEET_BULK_MAX_INFLIGHT",
+                            BULK_MAX_INFLIGHT or max(1, threads // 2))
+
+# The configuration actually in effect, reported by /health.
+tuning = {
+    "cpus": cpus,
+    "http_threads": threads,
+    "inference_layout": None,
+    "batch_window_ms": BATCH_WINDOW_MS,
+    "batch_max_size": BATCH_MAX_SIZE,
+    "max_inflight_requests": MAX_INFLIGHT_REQUESTS,
+    "bulk_max_inflight": BULK_MAX_INFLIGHT,
+    "vad_gating": VAD_GATING,
+    "chunk_seconds": CHUNK_SECONDS,
+    "chunk_overlap_seconds": CHUNK_OVERLAP_SECONDS,
+    "autotune": os.environ.get("PARAKEET_AUTOTUNE", AUTOTUNE).lower(),
+    "autotune_result": None,
+    "overrides": [name for name in TUNING_ENV if os.environ.get(name)],
+}
+
+
+def parse_inference_layout(layout):
+    """Parse a WORKERSxTHREADS layout such as "2x4" into (2, 4)."""
+    try:
+        workers, threads_per_worker = (int(part) for part in layout.lower().split("x"))
+    except ValueError:
+        raise ValueError(f"Invalid inference layout '{layout}', expected e.g. 2x4")
+    if workers < 1 or threads_per_worker < 1:
+        raise ValueError(f"Invalid inference layout '{layout}', values must be >= 1")
+    return workers, threads_per_worker
+
+
+def session_options(intra_threads, optimization_level=None):
     import onnxruntime as ort
 
     sess_options = ort.SessionOptions()
-    sess_options.intra_op_num_threads = 8
+    sess_options.intra_op_num_threads = intra_threads
     sess_options.inter_op_num_threads = 1
     sess_options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
-    sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    sess_options.graph_optimization_level = (
+        ort.GraphOptimizationLevel.ORT_ENABLE_ALL if optimization_level is None
+        else optimization_level)
+    return sess_options
+
+
+def _cpu_fingerprint():
+    """Short hash of the CPU architecture and feature flags."""
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = next((line for line in f if line.startswith("flags")), "")
+    except OSError:
+        flags = ""
+    return hashlib.sha256(f"{platform.machine()}:{flags}".encode()).hexdigest()[:12]
+
+
+def _graph_cache_dir():
+    import onnxruntime as ort
+
+    cache_dir = os.environ.get("PARAKEET_GRAPH_CACHE_DIR", GRAPH_CACHE_DIR)
+    if not cache_dir:
+        return None
+    return os.path.join(cache_dir, f"ort-{ort.__version__}-{_cpu_fingerprint()}")
 
-    asr_model = onnx_asr.load_model(
-        "nemo-parakeet-tdt-0.6b-v3",
-        quantization="int8",
-        providers=["CPUExecutionProvider"],
-        sess_options=sess_options,
-    ).with_timestamps()
-    print("Model loaded successfully with CPU optimization!")
-except Exception as e:
-    print(f"Model loading failed: {e}")
-    import traceback
-    traceback.print_exc()
-    sys.exit(1)
 
-print("=" * 50)
+@contextlib.contextmanager
+def cached_graphs(intra_threads, counts):
+    """Route onnx_asr's InferenceSession calls through the optimized graph cache.
+
+    onnx_asr builds every session from the single SessionOptions it is given,
+    so each session gets its own options here, with optimized_model_filepath
+    pointing at a per-file cache entry. Cached graphs load with optimization
+    disabled; hits and misses are tallied in ``counts``.
+    """
+    import onnxruntime as ort
+
+    cache_dir = _graph_cache_dir()
+    if cache_dir is None:
+        yield
+        return
+    os.makedirs(cache_dir, exist_ok=True)
+    original = ort.InferenceSession
+
+    def session(path_or_bytes, sess_options=None, providers=None, provider_options=None,
+                **kwargs):
+        def create(model, options):
+            return original(model, options, providers, provider_options, **kwargs)
+
+        if not isinstance(path_or_bytes, (str, os.PathLike)):
+            return create(path_or_bytes, sess_options)
+        source = os.path.realpath(path_or_bytes)
+        stat = os.stat(source)
+        tag = hashlib.sha256(f"{source}:{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:12]
+        cached = os.path.join(cache_dir, f"{os.path.basename(path_or_bytes)}.{tag}.onnx")
+
+        if os.path.exists(cached):
+            try:
+                optimized = create(cached, session_options(
+                    intra_threads, ort.GraphOptimizationLevel.ORT_DISABLE_ALL))
+                counts["hits"] += 1
+                return optimized
+            except Exception as e:
+                print(f"Discarding unusable optimized graph {cached}: {e}")
+                os.remove(cached)
+
+        counts["misses"] += 1
+        options = session_options(intra_threads)
+        partial = f"{cached}.{os.getpid()}.tmp"
+        options.optimized_model_filepath = partial
+        try:
+            optimized = create(source, options)
+            os.replace(partial, cached)
+            return optimized
+        except Exception as e:
+            print(f"Could not cache optimized graph for {source}: {e}")
+            if os.path.exists(partial):
+                os.remove(partial)
+            return create(source, session_options(intra_threads))
+
+    ort.InferenceSession = session
+    try:
+        yield
+    finally:
+        ort.InferenceSession = original
+
+
+def load_asr_model(intra_threads, graph_counts=None):
+    import onnx_asr
+
+    with cached_graphs(intra_threads, graph_counts if graph_counts is not None
+                       else collections.Counter()):
+        return onnx_asr.load_model(
+            MODEL_NAME,
+            quantization=QUANTIZATION,
+            providers=["CPUExecutionProvider"],
+            sess_options=session_options(intra_threads),
+        ).with_timestamps()
+
+
+def synthetic_audio(seconds, seed=0):
+    """Voiced syllables: a gliding harmonic source shaped by vowel formants.
+
+    Unlike noise, the model emits tokens for this, so timing it covers the
+    TDT decoder loop as well as the encoder.
+    """
+    rng = np.random.default_rng(seed)
+    total = int(seconds * SAMPLE_RATE)
+    audio = np.zeros(total)
+    position = int(rng.uniform(0.05, 0.2) * SAMPLE_RATE)
+    while position < total:
+        n = min(int(rng.uniform(0.15, 0.35) * SAMPLE_RATE), total - position)
+        glide = np.linspace(0.0, 1.0, n)
+        f0 = rng.uniform(100.0, 200.0) * (1.1 - 0.2 * glide)
+        phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+        formants = VOWEL_FORMANTS[rng.integers(len(VOWEL_FORMANTS))]
+        syllable = np.zeros(n)
+        for harmonic in range(1, int(SAMPLE_RATE / 2 / f0.max())):
+            freq = f0 * harmonic
+            gain = sum(1.0 / (1.0 + ((freq - formant) / 100.0) ** 2) for formant in formants)
+            syllable += gain / harmonic * np.sin(harmonic * phase)
+        audio[position:position + n] = np.hanning(n) * syllable
+        position += n + int(rng.uniform(0.03, 0.3) * SAMPLE_RATE)
+    peak = np.abs(audio).max()
+    return (audio * (0.3 / peak if peak else 0.0)).astype(np.float32)
+
+
+def warm_up(model):
+    """Recognize synthetic audio so lazy allocation and kernel setup happen now.
+
+    Returns the time it took.
+    """
+    samples = synthetic_audio(WARMUP_SECONDS)
+    started = time.perf_counter()
+    model.recognize([samples])
+    return time.perf_counter() - started
+
+
+def autotune_layouts(available):
+    """Candidate (workers, threads) layouts that fit ``available`` CPUs."""
+    layouts = []
+    for workers in (1, 2, 4):
+        if workers <= available and (workers, available // workers) not in layouts:
+            layouts.append((workers, available // workers))
+    return layouts
+
+
+def benchmark_layout(workers, intra_threads):
+    """Time one layout: single-clip latency, and throughput per batch size.
+
+    Throughput is seconds of audio recognized per wall-clock second while
+    every worker drains a shared queue of AUTOTUNE_CHUNKS clips. Also
+    returns how many tokens the clip decoded to.
+    """
+    models = [load_asr_model(intra_threads) for _ in range(workers)]
+    for model in models:
+        warm_up(model)
+    clip = synthetic_audio(AUTOTUNE_CHUNK_SECONDS, seed=1)
+    latency = float("inf")
+    for _ in range(2):
+        started = time.perf_counter()
+        tokens = len(models[0].recognize([clip])[0].tokens)
+        latency = min(latency, time.perf_counter() - started)
+
+    throughput = {}
+    for batch_size in AUTOTUNE_BATCH_SIZES:
+        if batch_size * workers > AUTOTUNE_CHUNKS:
+            continue
+        pending = [clip] * AUTOTUNE_CHUNKS
+        lock = threading.Lock()
+
+        def drain(model):
+            while True:
+                with lock:
+                    batch, pending[:] = pending[:batch_size], pending[batch_size:]
+                if not batch:
+                    return
+                model.recognize(batch)
+
+        started = time.perf_counter()
+        runners = [threading.Thread(target=drain, args=(model,)) for model in models]
+        for runner in runners:
+            runner.start()
+        for runner in runners:
+            runner.join()
+        throughput[batch_size] = AUTOTUNE_CHUNKS * AUTOTUNE_CHUNK_SECONDS / (
+            time.perf_counter() - started)
+    return latency, throughput, tokens
+
+
+def run_autotune():
+    """Benchmark every candidate layout and batch size, returning (best, measured)."""
+    measured = []
+    for workers, intra_threads in autotune_layouts(cpus["available"]):
+        layout = f"{workers}x{intra_threads}"
+        latency, throughput, tokens = benchmark_layout(workers, intra_threads)
+        gc.collect()  # release this layout's sessions before loading the next
+        for batch_size, rate in throughput.items():
+            print(f"Autotune {layout} batch {batch_size}: {rate:.1f}x realtime, "
+                  f"single clip {latency:.2f}s ({tokens} tokens)")
+            measured.append({"layout": layout, "batch_max_size": batch_size,
+                             "throughput": round(rate, 2), "latency_seconds": round(latency, 3),
+                             "tokens": tokens})
+    fastest_clip = min(entry["latency_seconds"] for entry in measured)
+    eligible = [entry for entry in measured
+                if entry["latency_seconds"] <= fastest_clip * AUTOTUNE_LATENCY_SLACK]
+    best = max(eligible, key=lambda entry: entry["throughput"])
+    return {"layout": best["layout"], "batch_max_size": best["batch_max_size"]}, measured
+
+
+def autotuned_config(mode):
+    """This host's tuned {"layout", "batch_max_size"}, benchmarking on first use.
+
+    Returns the config and whether it was "cached" or "measured".
+    """
+    import onnxruntime as ort
+
+    path = os.environ.get("PARAKEET_AUTOTUNE_FILE", AUTOTUNE_FILE)
+    quota = "none" if cpus["quota"] is None else f"{cpus['quota']:g}"
+    key = (f"{MODEL_NAME}:{QUANTIZATION}:ort-{ort.__version__}:{_cpu_fingerprint()}:"
+           f"affinity-{cpus['affinity']}:quota-{quota}:sample-{AUTOTUNE_SAMPLE}")
+    try:
+        with open(path) as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        stored = {}
+    if mode != "force" and key in stored:
+        entry = stored[key]
+        return {"layout": entry["layout"], "batch_max_size": entry["batch_max_size"]}, "cached"
+
+    print(f"Autotuning inference for {cpus['available']} CPU(s)...")
+    best, measured = run_autotune()
+    stored[key] = {**best, "tuned_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                   "measured": measured}
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    partial = f"{path}.{os.getpid()}.tmp"
+    with open(partial, "w") as f:
+        json.dump(stored, f, indent=2)
+    os.replace(partial, path)
+    print(f"Autotune picked {best['layout']} with batches of {best['batch_max_size']}, "
+          f"saved to {path}")
+    return best, "measured"
+
+
+RecognitionResult = collections.namedtuple("RecognitionResult", "text tokens timestamps")
+
+
+class WorkerLost(Exception):
+    """The inference process behind a RemoteModel connection went away."""
+
+
+class RemoteModel:
+    """Runs batches on a pre-forked inference process over a Unix socket."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def lost(self):
+        """True once the worker has hung up; it sends nothing between batches."""
+        try:
+            return self.conn.poll()
+        except (EOFError, OSError):
+            return True
+
+    def recognize(self, batch):
+        try:
+            self.conn.send([np.ascontiguousarray(samples) for samples in batch])
+            status, payload = self.conn.recv()
+        except (EOFError, OSError) as e:
+            raise WorkerLost(str(e) or type(e).__name__)
+        if status == "error":
+            raise RuntimeError(payload)
+        return [RecognitionResult(*fields) for fields in payload]
+
+
+def _connect_to_front(address, authkey, attempts=100):
+    for _ in range(attempts - 1):
+        try:
+            return multiprocessing.connection.Client(address, "AF_UNIX", authkey=authkey)
+        except (FileNotFoundError, ConnectionRefusedError):
+            time.sleep(0.1)
+    return multiprocessing.connection.Client(address, "AF_UNIX", authkey=authkey)
+
+
+def _inference_worker(model, address, authkey, load_info):
+    warmup_seconds = warm_up(model)
+    conn = _connect_to_front(address, authkey)
+    conn.send({**load_info, "warmup_seconds": round(warmup_seconds, 3)})
+    print(f"[worker {os.getpid()}] Warmed up in {warmup_seconds:.2f}s, ready for batches")
+    while True:
+        try:
+            batch = conn.recv()
+        except EOFError:
+            return
+        try:
+            results = model.recognize(batch)
+            payload = ("ok", [(r.text, list(r.tokens), list(r.timestamps)) for r in results])
+        except Exception as e:
+            payload = ("error", str(e))
+        conn.send(payload)
+
+
+def _fork(target, *args):
+    """Fork a child that runs ``target`` and exits without returning here."""
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            target(*args)
+        except BaseException:
+            import traceback
+            traceback.print_exc()
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def _supervise_workers(count, address, authkey, front_pid):
+    print(f"[supervisor] Loading model for {count} worker process(es)...")
+    started = time.perf_counter()
+    graph_counts = collections.Counter()
+    model = load_asr_model(1, graph_counts)
+    load_info = {"load_seconds": round(time.perf_counter() - started, 3),
+                 "graph_cache": dict(graph_counts)}
+    print(f"[supervisor] Model loaded in {load_info['load_seconds']:.1f}s, forking workers")
+
+    children = {}
+    for _ in range(count):
+        children[_fork(_inference_worker, model, address, authkey, load_info)] = time.monotonic()
+
+    while children:
+        pid, status = os.wait()
+        started = children.pop(pid, None)
+        if os.getppid() != front_pid:
+            continue  # front is gone; let the remaining workers drain
+        print(f"[supervisor] Worker {pid} exited with status {status}, re-forking")
+        if started is not None and time.monotonic() - started < 1.0:
+            time.sleep(1.0)
+        children[_fork(_inference_worker, model, address, authkey, load_info)] = time.monotonic()
+
+
+def _watch_supervisor(pid):
+    _, status = os.waitpid(pid, 0)
+    print(f"Worker supervisor exited with status {status}, shutting down")
+    os._exit(1)
+
+
+def start_worker_processes(count):
+    """Fork the model supervisor; must run before this process starts threads."""
+    # A fresh directory per run: the server is PID 1 in the container, so a
+    # PID-named socket left behind by a killed run would block the next bind.
+    address = os.path.join(tempfile.mkdtemp(prefix="parakeet-"), "workers.sock")
+    authkey = os.urandom(32)
+    pid = _fork(_supervise_workers, count, address, authkey, os.getpid())
+    threading.Thread(target=_watch_supervisor, args=(pid,), daemon=True,
+                     name="supervisor-watch").start()
+    return address, authkey
+
+
+process_started = time.time()
+startup = {"load_seconds": None, "warmup_seconds": None, "graph_cache": {}, "ready_seconds": None}
+
+worker_processes = env_int("PARAKEET_WORKER_PROCESSES", WORKER_PROCESSES)
+if worker_processes > 0:
+    tuning.update(worker_processes=worker_processes, inference_layout=f"{worker_processes}x1")
+    inference_endpoint = start_worker_processes(worker_processes)
+    print(f"Serving with {worker_processes} pre-forked inference process(es)")
+
+
+def load_models(scheduler):
+    """Load, warm up and attach the in-process inference pool."""
+    try:
+        inference_layout = (os.environ.get("PARAKEET_INFERENCE_LAYOUT") or INFERENCE_LAYOUT
+                            or f"1x{cpus['available']}")
+        mode = tuning["autotune"]
+        if mode in ("on", "1", "true", "force") and not (os.environ.get("PARAKEET_INFERENCE_LAYOUT")
+                                            and os.environ.get("PARAKEET_BATCH_MAX_SIZE")):
+            tuned, tuning["autotune_result"] = autotuned_config(mode)
+            if not os.environ.get("PARAKEET_INFERENCE_LAYOUT"):
+                inference_layout = tuned["layout"]
+            if not os.environ.get("PARAKEET_BATCH_MAX_SIZE"):
+                scheduler.max_batch = tuned["batch_max_size"]
+        tuning.update(inference_layout=inference_layout, batch_max_size=scheduler.max_batch)
+        print("\nLoading Parakeet TDT 0.6B V3 ONNX model with INT8 quantization...")
+        inference_workers, intra_threads = parse_inference_layout(inference_layout)
+        started = time.perf_counter()
+        graph_counts = collections.Counter()
+        asr_models = [load_asr_model(intra_threads, graph_counts)
+                      for _ in range(inference_workers)]
+        startup["load_seconds"] = round(time.perf_counter() - started, 3)
+        startup["graph_cache"] = dict(graph_counts)
+        print(f"Model loaded successfully with CPU optimization! "
+              f"({inference_workers} worker(s) x {intra_threads} threads, "
+              f"{startup['load_seconds']:.1f}s)")
+        startup["warmup_seconds"] = round(max(warm_up(model) for model in asr_models), 3)
+        print(f"Warm-up inference took {startup['warmup_seconds']:.2f}s")
+    except Exception as e:
+        print(f"Model loading failed: {e}")
+        import traceback
+        traceback.print_exc()
+        os._exit(1)
+    profiler.intra_threads = intra_threads
+    scheduler.start(asr_models)
+    startup["ready_seconds"] = round(time.time() - process_started, 3)
+    print("=" * 50)
 
 
 app = Flask(__name__)
 app.config["UPLOAD_FOLDER"] = "temp_uploads"
 os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
-app.config["MAX_CONTENT_LENGTH"] = 100 * 1024 * 1024
+app.config["MAX_CONTENT_LENGTH"] = env_int("PARAKEET_MAX_UPLOAD_MB", MAX_UPLOAD_MB) * 1024 * 1024
+
+# Latency histograms exported in Prometheus text format at /metrics.
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+RTF_BUCKETS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0)
+
+
+def _labels(**labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+
+class Histogram:
+    """Cumulative Prometheus histogram, optionally partitioned by one label."""
+
+    def __init__(self, name, help_text, buckets, label=None):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.label = label
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, label_value=None):
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [[0] * len(self.buckets), 0.0, 0]
+            i = bisect.bisect_left(self.buckets, value)
+            if i < len(self.buckets):
+                series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted(self._series.items(), key=lambda item: str(item[0]))
+            for label_value, (counts, total, count) in series:
+                labels = {self.label: label_value} if self.label else {}
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{self.name}_bucket{_labels(**labels, le=bound)} {cumulative}")
+                lines.append(f"{self.name}_bucket{_labels(**labels, le='+Inf')} {count}")
+                lines.append(f"{self.name}_sum{_labels(**labels)} {total}")
+                lines.append(f"{self.name}_count{_labels(**labels)} {count}")
+        return lines
+
+
+stage_seconds = Histogram(
+    "parakeet_stage_duration_seconds",
+    "Time spent in each transcription pipeline stage (recognize is per batch).",
+    STAGE_BUCKETS, "stage")
+queue_wait_seconds = Histogram(
+    "parakeet_chunk_queue_wait_seconds",
+    "Time a chunk waited in the scheduler queue before inference.",
+    STAGE_BUCKETS, "priority")
+realtime_factor = Histogram(
+    "parakeet_realtime_factor",
+    "Processing time divided by audio duration per transcription.",
+    RTF_BUCKETS)
+transcribed = {"audio_seconds": 0.0, "transcriptions": 0, "gated_seconds": 0.0}
+transcribed_lock = threading.Lock()
+# The Trace of the request a thread is serving, if it is being profiled.
+tracing = threading.local()
+
+
+@contextlib.contextmanager
+def timed(stage):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        finished = time.perf_counter()
+        stage_seconds.observe(finished - started, stage)
+        trace = getattr(tracing, "trace", None)
+        if trace is not None:
+            trace.add(stage, started, finished)
+
+
+class Trace:
+    """Timed spans of one request, saved as Chrome trace-event JSON.
+
+    Spans are ``time.perf_counter()`` intervals and may be added from any
+    thread; each thread gets its own track in the viewer.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.origin = time.perf_counter()
+        self.events = []
+        self.threads = {}
+
+    def add(self, name, started, finished, **args):
+        tid = threading.get_native_id()
+        self.threads.setdefault(tid, threading.current_thread().name)
+        self.events.append({"name": name, "ph": "X", "pid": os.getpid(), "tid": tid,
+                            "ts": round((started - self.origin) * 1e6, 1),
+                            "dur": round((finished - started) * 1e6, 1), "args": args})
+
+    @contextlib.contextmanager
+    def span(self, name, **args):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, started, time.perf_counter(), **args)
+
+    def to_json(self):
+        names = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid,
+                  "args": {"name": name}} for tid, name in self.threads.items()]
+        return json.dumps({"traceEvents": names + self.events, "displayTimeUnit": "ms"})
+
+
+@contextlib.contextmanager
+def profiled_sessions(prefix, sessions):
+    """Turn on ORT profiling for each InferenceSession created inside.
+
+    Entered outside cached_graphs, so the options it builds per session are
+    the ones changed here. Sessions are appended to ``sessions`` and each
+    profiles to a file of its own under ``prefix``.
+    """
+    import onnxruntime as ort
 
-progress_tracker = {}
-PROGRESS_TTL = 60
+    original = ort.InferenceSession
 
+    def session(path_or_bytes, sess_options=None, *args, **kwargs):
+        if sess_options is not None:
+            name = (os.path.basename(path_or_bytes).split(".")[0]
+                    if isinstance(path_or_bytes, (str, os.PathLike)) else "model")
+            sess_options.enable_profiling = True
+            sess_options.profile_file_prefix = f"{prefix}-{len(sessions)}-{name}"
+        created = original(path_or_bytes, sess_options, *args, **kwargs)
+        sessions.append(created)
+        return created
 
-def evict_stale_progress():
-    now = time.time()
-    stale = [k for k, v in progress_tracker.items()
-             if v.get("status") == "complete" and now - v.get("completed_at", 0) > PROGRESS_TTL]
-    for k in stale:
-        del progress_tracker[k]
+    ort.InferenceSession = session
+    try:
+        yield
+    finally:
+        ort.InferenceSession = original
+
+
+class Profiler:
+    """Arms request traces and ORT operator profiling for a bounded number of uses.
+
+    ``armed`` is true only while a profiled model is ready to take a batch;
+    the scheduler checks it before each batch and otherwise does nothing.
+    A profiled model not used up within ``timeout`` seconds is finished
+    early. Artifacts are written to ``directory``, newest ``max_artifacts``
+    kept.
+    """
+
+    def __init__(self, directory, max_artifacts, timeout):
+        self.directory = directory
+        self.max_artifacts = max_artifacts
+        self.timeout = timeout
+        self.armed = False
+        # Set by load_models; stays None while inference runs in pre-forked
+        # processes, which cannot be profiled from here.
+        self.intra_threads = None
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._inferences = 0
+        self._loading = False
+        self._model = None
+        self._sessions = []
+        self._deadline = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    def arm_requests(self, count):
+        with self._lock:
+            self._requests = count
+
+    def take_request(self):
+        """Use one armed request trace; False if none is armed."""
+        if not self._requests:
+            return False
+        with self._lock:
+            if not self._requests:
+                return False
+            self._requests -= 1
+            return True
+
+    def save_trace(self, trace):
+        self._write(f"trace-{trace.name}.json", trace.to_json())
+
+    def arm_inferences(self, count):
+        """Load a profiled model for the next ``count`` batches.
+
+        Returns an error message if ORT profiling is unavailable or already
+        running, None once loading has started.
+        """
+        with self._lock:
+            if self.intra_threads is None:
+                return "ORT profiling needs in-process inference (PARAKEET_WORKER_PROCESSES=0)"
+            if self._loading or self._model is not None:
+                return "ORT profiling is already running"
+            self._loading = True
+            self._inferences = count
+        threading.Thread(target=self._load, daemon=True, name="profile-loader").start()
+        return None
+
+    def _load(self):
+        prefix = os.path.join(self.directory, f"ort-{time.strftime('%Y%m%d-%H%M%S')}")
+        sessions = []
+        try:
+            with profiled_sessions(prefix, sessions):
+                model = load_asr_model(self.intra_threads)
+        except Exception as e:
+            print(f"Could not load a profiled model: {e}")
+            with self._lock:
+                self._loading = False
+                self._inferences = 0
+                self.last_error = str(e)
+            return
+        with self._lock:
+            self._loading = False
+            self._model, self._sessions = model, sessions
+            self._deadline = time.monotonic() + self.timeout
+            self.armed = True
+        timer = threading.Timer(self.timeout, self._expire, args=(model,))
+        timer.daemon = True
+        timer.start()
+        print(f"ORT profiling armed for {self._inferences} batch(es)")
+
+    def claim(self):
+        """Take the profiled model for one batch, or None if another has it."""
+        with self._lock:
+            model, self._model = self._model, None
+            self.armed = False
+            return model
+
+    def release(self, model):
+        with self._lock:
+            self._inferences -= 1
+            if self._inferences > 0 and time.monotonic() < self._deadline:
+                self._model = model
+                self.armed = True
+                return
+            self._inferences = 0
+        self._finish()
+
+    def _expire(self, model):
+        """Finish ``model``'s profile if it is still waiting for batches.
+
+        A model in use by a batch is finished by ``release`` instead.
+        """
+        with self._lock:
+            if self._model is not model:
+                return
+            self._model, self._inferences = None, 0
+            self.armed = False
+        print("ORT profiling timed out before all its batches ran")
+        self._finish()
+
+    def _finish(self):
+        """Write the ORT profiles and drop the sessions, freeing the model."""
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            try:
+                path = session.end_profiling()
+            except Exception as e:
+                print(f"Could not finish an ORT profile: {e}")
+                continue
+            if path:
+                print(f"Wrote ORT profile {path}")
+        self._prune()
+
+    def _write(self, name, data):
+        path = os.path.join(self.directory, name)
+        with open(f"{path}.tmp", "w") as f:
+            f.write(data)
+        os.replace(f"{path}.tmp", path)
+        self._prune()
+
+    def _prune(self):
+        for artifact in self.artifacts()[self.max_artifacts:]:
+            with contextlib.suppress(OSError):
+                os.remove(os.path.join(self.directory, artifact["name"]))
+
+    def artifacts(self):
+        """Finished artifacts, newest first."""
+        found = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json") and entry.is_file():
+                    stat = entry.stat()
+                    found.append((stat.st_mtime, entry.name, stat.st_size))
+        return [{"name": name, "size": size, "modified": mtime,
+                 "url": f"/debug/profile/{name}"}
+                for mtime, name, size in sorted(found, reverse=True)]
+
+    def status(self):
+        with self._lock:
+            return {
+                "requests_remaining": self._requests,
+                "inferences_remaining": self._inferences,
+                "ort_loading": self._loading,
+                "ort_available": self.intra_threads is not None,
+                "last_error": self.last_error,
+                "artifacts": self.artifacts(),
+            }
 
 
-def get_audio_duration(file_path):
-    command = [
-        "ffprobe", "-v", "error",
-        "-show_entries", "format=duration",
-        "-of", "default=noprint_wrappers=1:nokey=1",
-        file_path,
-    ]
-    try:
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-        return float(result.stdout)
-    except (subprocess.CalledProcessError, ValueError) as e:
-        print(f"Could not get duration of file '{file_path}': {e}")
-        return 0.0
+def record_transcription(started, total_duration):
+    realtime_factor.observe((time.perf_counter() - started) / total_duration)
+    with transcribed_lock:
+        transcribed["audio_seconds"] += total_duration
+        transcribed["transcriptions"] += 1
 
 
-def detect_silence_points(file_path, silence_thresh=SILENCE_THRESHOLD,
-                          silence_duration=SILENCE_MIN_DURATION,
-                          total_duration=None):
-    if not os.path.exists(file_path):
-        print(f"Error: Audio file '{file_path}' not found for silence detection")
-        return []
+ALLOWED_EXTENSIONS = {".wav", ".mp3", ".m4a", ".ogg", ".flac", ".mp4", ".webm",
+                      ".aac", ".wma", ".opus", ".mkv", ".avi", ".mov"}
+RESPONSE_FORMATS = {"json", "text", "srt", "verbose_json", "vtt"}
 
-    command = [
-        "ffmpeg", "-hide_banner", "-nostats",
-        "-i", file_path,
-        "-af", f"silencedetect=noise={silence_thresh}:d={silence_duration}",
-        "-f", "null", "-"
-    ]
 
-    try:
-        result = subprocess.run(command, capture_output=True, text=True,
-                                timeout=SILENCE_DETECT_TIMEOUT)
-        silence_points = []
-        silence_start = None
+class JobStore:
+    """Transcription jobs indexed by id and by state, with bounded retention.
+
+    Each state keeps its job ids in insertion order, so the oldest job in a
+    state is found without scanning. Finished jobs are evicted oldest first
+    once they outlive ``ttl``, exceed ``max_finished``, or their stored
+    results exceed ``max_result_bytes``.
+    """
+
+    STATES = ("queued", "processing", "complete", "failed")
+    FINISHED = ("complete", "failed")
+
+    def __init__(self, ttl, max_finished, max_result_bytes):
+        self.ttl = ttl
+        self.max_finished = max_finished
+        self.max_result_bytes = max_result_bytes
+        self._jobs = {}
+        self._by_state = {state: collections.OrderedDict() for state in self.STATES}
+        self._finished = collections.OrderedDict()
+        self._results = {}
+        self._result_bytes = 0
+        self._lock = threading.Lock()
 
-        for line in result.stderr.splitlines():
-            if 'silence_start:' in line:
+    def create(self, job_id, status, **fields):
+        job = {
+            "status": status,
+            "current_chunk": 0,
+            "total_chunks": 0,
+            "progress_percent": 0,
+            "partial_text": [],
+            "created_at": time.time(),
+            **fields,
+        }
+        with self._lock:
+            self._evict()
+            self._jobs[job_id] = job
+            self._by_state[status][job_id] = None
+
+    def _move(self, job_id, status):
+        job = self._jobs[job_id]
+        del self._by_state[job["status"]][job_id]
+        job["status"] = status
+        self._by_state[status][job_id] = None
+        return job
+
+    def _active(self, job_id):
+        job = self._jobs.get(job_id)
+        return job is not None and job["status"] not in self.FINISHED
+
+    def start(self, job_id, **fields):
+        with self._lock:
+            if not self._active(job_id):
+                return
+            job = self._jobs[job_id]
+            if job["status"] != "processing":
+                self._move(job_id, "processing")
+            job.update(fields)
+
+    def progress(self, job_id, current_chunk, text=None):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job["current_chunk"] = current_chunk
+            total_chunks = job["total_chunks"]
+            job["progress_percent"] = (None if total_chunks is None
+                                       else int(current_chunk / max(total_chunks, 1) * 100))
+            if text:
+                job["partial_text"].append(text)
+
+    def _finish(self, job_id, status, **fields):
+        job = self._move(job_id, status)
+        job.update(fields, completed_at=time.time())
+        self._finished[job_id] = None
+
+    def complete(self, job_id, result=None):
+        with self._lock:
+            if not self._active(job_id):
+                return
+            self._finish(job_id, "complete", progress_percent=100)
+            if result is not None:
+                size = result.nbytes
+                self._results[job_id] = (result, size)
+                self._result_bytes += size
+            self._evict()
+
+    def fail(self, job_id, error):
+        """Mark a job failed unless it has already finished."""
+        with self._lock:
+            if not self._active(job_id):
+                return
+            self._finish(job_id, "failed", error=error)
+            self._evict()
+
+    def _evict(self):
+        now = time.time()
+        while self._finished:
+            job_id = next(iter(self._finished))
+            expired = now - self._jobs[job_id]["completed_at"] > self.ttl
+            if not (expired or len(self._finished) > self.max_finished
+                    or self._result_bytes > self.max_result_bytes):
+                break
+            del self._finished[job_id]
+            job = self._jobs.pop(job_id)
+            del self._by_state[job["status"]][job_id]
+            _, size = self._results.pop(job_id, (None, 0))
+            self._result_bytes -= size
+
+    @staticmethod
+    def _view(job):
+        # Partial text is kept as a list of chunk texts so appending stays
+        # linear; readers get it joined.
+        return {**job, "partial_text": " ".join(job["partial_text"])}
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._view(job) if job else None
+
+    def result(self, job_id):
+        with self._lock:
+            result, _ = self._results.get(job_id, (None, 0))
+            return result
+
+    def oldest(self, status):
+        with self._lock:
+            for job_id in self._by_state[status]:
+                return job_id, self._view(self._jobs[job_id])
+        return None, None
+
+    def count(self, status):
+        with self._lock:
+            return len(self._by_state[status])
+
+    def stats(self):
+        with self._lock:
+            return {
+                **{state: len(ids) for state, ids in self._by_state.items()},
+                "result_bytes": self._result_bytes,
+                "max_result_bytes": self.max_result_bytes,
+            }
+
+
+jobs = JobStore(JOB_TTL, MAX_FINISHED_JOBS, MAX_RESULT_BYTES)
+
+
+class TranscriptCache:
+    """Transcripts keyed on upload content, in memory and optionally on disk.
+
+    Both tiers evict least recently used entries first once over their byte
+    budget, and disk entries also once unused for ``disk_max_age`` seconds.
+    Inserts are written through to disk, so entries survive a restart; a
+    disk hit is promoted back into memory. A ``read_only`` cache serves the
+    disk tier but never writes or deletes files there, so a second process
+    can share another's directory without exceeding its budget.
+    """
+
+    def __init__(self, memory_bytes, disk_dir, disk_bytes, disk_max_age, read_only=False):
+        self.memory_bytes = memory_bytes
+        self.disk_dir = disk_dir if disk_bytes > 0 else None
+        self.disk_bytes = disk_bytes
+        self.disk_max_age = disk_max_age
+        self.read_only = read_only
+        self._memory = collections.OrderedDict()
+        self._memory_used = 0
+        self._disk = collections.OrderedDict()
+        self._disk_used = 0
+        self._counts = collections.Counter()
+        self._lock = threading.Lock()
+        if self.disk_dir:
+            self._scan_disk()
+
+    def _scan_disk(self):
+        os.makedirs(self.disk_dir, exist_ok=True)
+        now = time.time()
+        entries = []
+        for entry in os.scandir(self.disk_dir):
+            stat = entry.stat()
+            if entry.name.endswith(".json"):
+                if stat.st_mtime >= now - self.disk_max_age:
+                    entries.append((stat.st_mtime, entry.name[:-5], stat.st_size))
+                    continue
+            elif stat.st_mtime >= now - CACHE_TEMP_GRACE_SECONDS:
+                continue  # possibly another process's write in flight
+            if not self.read_only:
+                os.remove(entry.path)  # expired, or a write interrupted by a restart
+        for used_at, key, size in sorted(entries):
+            self._disk[key] = (size, used_at)
+            self._disk_used += size
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _expire(self):
+        """Drop disk entries over the byte budget or past the age limit.
+
+        Call with the lock held; returns the keys whose files to delete.
+        """
+        cutoff = time.time() - self.disk_max_age
+        stale = []
+        while self._disk:
+            key, (size, used_at) = next(iter(self._disk.items()))
+            if self._disk_used <= self.disk_bytes and used_at >= cutoff:
+                break
+            del self._disk[key]
+            self._disk_used -= size
+            stale.append(key)
+        return stale
+
+    def _delete(self, keys):
+        if self.read_only:
+            return
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def _remember(self, key, result, size):
+        if size > self.memory_bytes:
+            return
+        _, old_size = self._memory.pop(key, (None, 0))
+        self._memory_used += size - old_size
+        self._memory[key] = (result, size)
+        while self._memory_used > self.memory_bytes:
+            _, (_, evicted) = self._memory.popitem(last=False)
+            self._memory_used -= evicted
+
+    def _read_disk(self, key):
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                data = f.read()
+            os.utime(path)
+            return Transcript.from_dict(json.loads(data)), len(data)
+        except (OSError, ValueError, KeyError):
+            return None, 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self._counts["memory_hits"] += 1
+                return entry[0]
+            stale = self._expire()
+            on_disk = key in self._disk
+        self._delete(stale)
+
+        if on_disk:
+            result, size = self._read_disk(key)
+            if result is not None:
+                with self._lock:
+                    if key in self._disk:
+                        self._disk[key] = (self._disk[key][0], time.time())
+                        self._disk.move_to_end(key)
+                    self._counts["disk_hits"] += 1
+                    self._remember(key, result, size)
+                return result
+
+        with self._lock:
+            self._counts["misses"] += 1
+        return None
+
+    def put(self, key, result):
+        data = json.dumps(result.to_dict())
+        with self._lock:
+            self._remember(key, result, len(data))
+        if not self.disk_dir or self.read_only or len(data) > self.disk_bytes:
+            return
+
+        path = self._path(key)
+        partial = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(partial, "w") as f:
+                f.write(data)
+            os.replace(partial, path)
+        except OSError as e:
+            print(f"Transcript cache write failed: {e}")
+            return
+
+        with self._lock:
+            self._disk_used += len(data) - self._disk.pop(key, (0, None))[0]
+            self._disk[key] = (len(data), time.time())
+            stale = self._expire()
+        self._delete(stale)
+
+    def stats(self):
+        with self._lock:
+            hits = self._counts["memory_hits"] + self._counts["disk_hits"]
+            lookups = hits + self._counts["misses"]
+            return {
+                "memory_hits": self._counts["memory_hits"],
+                "disk_hits": self._counts["disk_hits"],
+                "misses": self._counts["misses"],
+                "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_used,
+                "max_memory_bytes": self.memory_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_used,
+                "max_disk_bytes": self.disk_bytes if self.disk_dir else 0,
+            }
+
+
+# The bulk CLI may run beside a live server on the same directories; it
+# reads the server's disk cache but leaves writing and eviction to the server.
+BULK_CLI = __name__ == "__main__" and sys.argv[1:2] == ["bulk"]
+transcripts = TranscriptCache(
+    CACHE_MEMORY_BYTES, os.environ.get("PARAKEET_CACHE_DIR", CACHE_DIR),
+    env_int("PARAKEET_CACHE_DISK_MB", CACHE_DISK_MB) * 1024 * 1024,
+    env_int("PARAKEET_CACHE_DISK_MAX_AGE_HOURS", CACHE_DISK_MAX_AGE_HOURS) * 3600,
+    read_only=BULK_CLI)
+
+
+def cached_transcript(cache_key):
+    """Look up the cache unless the client sent Cache-Control: no-cache."""
+    if request.cache_control.no_cache:
+        return None
+    return transcripts.get(cache_key)
+
+
+def upload_digest(stream, pcm_format=None):
+    """Hash an upload for the transcript cache and rewind it.
+
+    Raw PCM is keyed by its declared format too: the same bytes at another
+    rate or encoding are different audio. Speech gating and the chunk
+    length and overlap change what the model hears, so they are part of the
+    key.
+    """
+    digest = hashlib.sha256(f"{MODEL_NAME}:{QUANTIZATION}:vad={int(VAD_GATING)}:"
+                            f"chunk={CHUNK_SECONDS:g}/{CHUNK_OVERLAP_SECONDS:g}\0".encode())
+    if pcm_format is not None:
+        digest.update(("%s:%d:%d\0" % pcm_format).encode())
+    for block in iter(lambda: stream.read(PIPE_BUFFER_SIZE), b""):
+        digest.update(block)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+PRIORITIES = ("interactive", "bulk")
+
+
+class QueueFull(Exception):
+    """Raised when admitting more work would exceed a queue bound."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class PendingChunk:
+    __slots__ = ("samples", "priority", "future", "submitted", "attempts", "trace")
+
+    def __init__(self, samples, priority):
+        self.samples = samples
+        self.priority = priority
+        self.future = concurrent.futures.Future()
+        self.submitted = time.monotonic()
+        self.attempts = 0
+        self.trace = getattr(tracing, "trace", None)
+
+
+class BatchScheduler:
+    """Groups chunks from concurrent requests into batched recognize() calls.
+
+    Chunks wait in one queue per priority class. Each worker serves the
+    highest-priority non-empty queue: it keeps collecting for up to
+    ``window`` seconds after the oldest chunk was submitted, or until
+    ``max_batch`` similar-length chunks are queued, and runs them through the
+    model in a single call. A batch takes at most its share of the queue
+    among the idle workers, so a few chunks still fan out across sessions.
+    Because bulk files are split into chunks, an interactive clip only ever
+    waits for the batch already running.
+    """
+
+    def __init__(self, window, max_batch, max_pad_ratio, max_queued):
+        self.window = window
+        self.max_batch = max_batch
+        self.max_pad_ratio = max_pad_ratio
+        self.max_queued = max_queued
+        self.workers = 0
+        self._idle = 0
+        self._pending = {priority: collections.deque() for priority in PRIORITIES}
+        self._cond = threading.Condition()
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = collections.Counter()
+        self._chunks = 0
+        self._inference_total = 0.0
+        self._workers_lost = 0
+        self._waits = {priority: {"chunks": 0, "total": 0.0, "max": 0.0}
+                       for priority in PRIORITIES}
+
+    def submit(self, samples, priority="bulk"):
+        return self.submit_many([samples], priority)[0]
+
+    def submit_many(self, chunks, priority):
+        """Queue all chunks of one request, or none if the class is full."""
+        items = [PendingChunk(samples, priority) for samples in chunks]
+        with self._cond:
+            queue = self._pending[priority]
+            if queue and len(queue) + len(items) > self.max_queued[priority]:
+                raise QueueFull(f"{priority} queue is full", self._retry_after(priority))
+            queue.extend(items)
+            self._cond.notify_all()
+        return [item.future for item in items]
+
+    def _retry_after(self, priority):
+        """Rough seconds until the backlog at or above ``priority`` drains."""
+        ahead = 0
+        for name in PRIORITIES:
+            ahead += len(self._pending[name])
+            if name == priority:
+                break
+        with self._stats_lock:
+            batches = sum(self._batch_sizes.values())
+            per_batch = self._inference_total / batches if batches else 1.0
+        seconds = ahead / self.max_batch * per_batch / max(self.workers, 1)
+        return max(1, math.ceil(seconds))
+
+    def estimate_wait(self, priority="bulk"):
+        with self._cond:
+            return self._retry_after(priority)
+
+    def _head_queue(self):
+        for priority in PRIORITIES:
+            if self._pending[priority]:
+                return priority
+        return None
+
+    def _fits(self, length, reference):
+        low, high = sorted((max(length, 1), max(reference, 1)))
+        return high / low <= self.max_pad_ratio
+
+    def _take_batch(self, priority):
+        queue = self._pending[priority]
+        reference = len(queue[0].samples)
+        limit = min(self.max_batch, math.ceil(len(queue) / max(self._idle, 1)))
+        batch, rest = [], collections.deque()
+        while queue:
+            item = queue.popleft()
+            if len(batch) < limit and self._fits(len(item.samples), reference):
+                # A streaming client that disconnected cancels its chunks;
+                # requeued items are already running and cannot be cancelled.
+                if item.attempts == 0 and not item.future.set_running_or_notify_cancel():
+                    continue
+                batch.append(item)
+            else:
+                rest.append(item)
+        self._pending[priority] = rest
+        return batch
+
+    def _next_batch(self, lost=None):
+        """Wait for the next batch; raises WorkerLost once ``lost()`` says so."""
+        with self._cond:
+            self._idle += 1
+            try:
+                while self._head_queue() is None:
+                    if lost is None:
+                        self._cond.wait()
+                    elif not self._cond.wait(WORKER_POLL_SECONDS) and lost():
+                        raise WorkerLost("connection closed while idle")
+                while True:
+                    priority = self._head_queue()
+                    if priority is None:
+                        return []
+                    queue = self._pending[priority]
+                    remaining = queue[0].submitted + self.window - time.monotonic()
+                    if len(queue) >= self.max_batch or remaining <= 0:
+                        return self._take_batch(priority)
+                    self._cond.wait(remaining)
+            finally:
+                self._idle -= 1
+
+    def _requeue(self, batch, error):
+        """Put a lost worker's batch back at the front of its queue."""
+        with self._cond:
+            for item in reversed(batch):
+                item.attempts += 1
+                if item.attempts < WORKER_MAX_ATTEMPTS:
+                    self._pending[item.priority].appendleft(item)
+                else:
+                    item.future.set_exception(
+                        RuntimeError(f"Inference worker lost twice: {error}"))
+            self._cond.notify_all()
+
+    def _record(self, batch, started, finished):
+        with self._stats_lock:
+            self._batch_sizes[len(batch)] += 1
+            self._chunks += len(batch)
+            for item in batch:
+                waited = started - item.submitted
+                wait = self._waits[item.priority]
+                wait["chunks"] += 1
+                wait["total"] += waited
+                wait["max"] = max(wait["max"], waited)
+                queue_wait_seconds.observe(waited, item.priority)
+            self._inference_total += finished - started
+        stage_seconds.observe(finished - started, "recognize")
+
+    @staticmethod
+    def _trace(batch, traces, started, clock):
+        """Add a traced batch's queue waits and inference to its requests' traces."""
+        finished = time.perf_counter()
+        for trace in traces:
+            for item in batch:
+                if item.trace is trace:
+                    trace.add("queue_wait", clock - (started - item.submitted), clock,
+                              priority=item.priority)
+            trace.add("recognize", clock, finished, batch_size=len(batch))
+
+    def _run(self, model):
+        with self._cond:
+            self.workers += 1
+        try:
+            while True:
                 try:
-                    silence_start = float(line.split('silence_start:')[1].split()[0])
-                except (ValueError, IndexError):
-                    silence_start = None
-            elif 'silence_end:' in line and silence_start is not None:
+                    batch = self._next_batch(getattr(model, "lost", None))
+                except WorkerLost as e:
+                    print(f"Inference worker lost ({e}), detaching it")
+                    with self._stats_lock:
+                        self._workers_lost += 1
+                    return
+                if not batch:
+                    continue
+                started = time.monotonic()
+                profiled = profiler.claim() if profiler.armed else None
+                traces = {item.trace for item in batch if item.trace is not None}
+                clock = time.perf_counter()
                 try:
-                    silence_end = float(line.split('silence_end:')[1].split()[0])
-                    silence_points.append((silence_start, silence_end))
-                    silence_start = None
-                except (ValueError, IndexError):
-                    pass
+                    results = (profiled or model).recognize([item.samples for item in batch])
+                except WorkerLost as e:
+                    print(f"Inference worker lost mid-batch ({e}), requeueing {len(batch)} chunk(s)")
+                    with self._stats_lock:
+                        self._workers_lost += 1
+                    self._requeue(batch, e)
+                    return
+                except Exception as e:
+                    print(f"Batched inference failed: {e}")
+                    for item in batch:
+                        item.future.set_exception(e)
+                else:
+                    for item, result in zip(batch, results):
+                        item.future.set_result(result)
+                finally:
+                    if profiled is not None:
+                        profiler.release(profiled)
+                self._record(batch, started, time.monotonic())
+                if traces:
+                    self._trace(batch, traces, started, clock)
+        finally:
+            with self._cond:
+                self.workers -= 1
+
+    def attach(self, model, name):
+        threading.Thread(target=self._run, args=(model,), daemon=True, name=name).start()
+
+    def start(self, models):
+        for i, model in enumerate(models):
+            self.attach(model, f"inference-worker-{i}")
+
+    def listen(self, address, authkey):
+        """Accept pre-forked inference processes as they (re)connect."""
+        listener = multiprocessing.connection.Listener(address, "AF_UNIX", authkey=authkey)
+
+        def accept_loop():
+            while True:
+                try:
+                    conn = listener.accept()
+                    hello = conn.recv()
+                except (OSError, EOFError, multiprocessing.AuthenticationError) as e:
+                    print(f"Rejected inference worker connection: {e}")
+                    continue
+                if startup["ready_seconds"] is None:
+                    startup.update(hello, ready_seconds=round(time.time() - process_started, 3))
+                self.attach(RemoteModel(conn), "inference-remote")
+
+        threading.Thread(target=accept_loop, daemon=True, name="inference-accept").start()
+
+    def queue_stats(self):
+        """Queue depth and wait times per priority class."""
+        with self._cond:
+            depths = {priority: len(queue) for priority, queue in self._pending.items()}
+        with self._stats_lock:
+            return {
+                priority: {
+                    "queued_chunks": depths[priority],
+                    "max_queued_chunks": self.max_queued[priority],
+                    "mean_wait_ms": (round(wait["total"] / wait["chunks"] * 1000, 2)
+                                     if wait["chunks"] else 0.0),
+                    "max_wait_ms": round(wait["max"] * 1000, 2),
+                }
+                for priority, wait in self._waits.items()
+            }
+
+    def stats(self):
+        with self._cond:
+            queued = sum(len(queue) for queue in self._pending.values())
+            workers = self.workers
+        with self._stats_lock:
+            batches = sum(self._batch_sizes.values())
+            waits = self._waits.values()
+            waited_chunks = sum(wait["chunks"] for wait in waits)
+            return {
+                "workers": workers,
+                "workers_lost": self._workers_lost,
+                "window_ms": self.window * 1000,
+                "max_batch_size": self.max_batch,
+                "queued_chunks": queued,
+                "batches": batches,
+                "chunks": self._chunks,
+                "mean_batch_size": round(self._chunks / batches, 2) if batches else 0.0,
+                "batch_size_counts": {str(k): v for k, v in sorted(self._batch_sizes.items())},
+                "mean_wait_ms": (round(sum(wait["total"] for wait in waits) / waited_chunks * 1000, 2)
+                                 if waited_chunks else 0.0),
+                "max_wait_ms": round(max(wait["max"] for wait in waits) * 1000, 2),
+                "inference_seconds": round(self._inference_total, 3),
+            }
 
-        if silence_start is not None and total_duration is not None:
-            silence_points.append((silence_start, total_duration))
 
-        return silence_points
-    except subprocess.TimeoutExpired:
-        print(f"Timeout: Silence detection exceeded {SILENCE_DETECT_TIMEOUT}s timeout")
-        return []
-    except (subprocess.CalledProcessError, OSError) as e:
-        print(f"Error running FFmpeg for silence detection: {e}")
+class AdmissionControl:
+    """Caps concurrent transcriptions overall and for the bulk class.
+
+    Keeping bulk below the waitress thread count leaves threads free for
+    interactive clips, and keeping the total below it leaves one thread to
+    answer health checks and turn excess requests away with a fast 503.
+    """
+
+    def __init__(self, max_inflight, bulk_max_inflight):
+        self.max_inflight = max_inflight
+        self.bulk_max_inflight = bulk_max_inflight
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._by_class = {priority: 0 for priority in PRIORITIES}
+        self._rejected = {priority: 0 for priority in (*PRIORITIES, "unclassified")}
+
+    def try_enter(self):
+        with self._lock:
+            if self._inflight >= self.max_inflight:
+                self._rejected["unclassified"] += 1
+                return False
+            self._inflight += 1
+            return True
+
+    def try_classify(self, priority):
+        with self._lock:
+            if priority == "bulk" and self._by_class["bulk"] >= self.bulk_max_inflight:
+                self._rejected["bulk"] += 1
+                return False
+            self._by_class[priority] += 1
+            return True
+
+    def reject(self, priority):
+        with self._lock:
+            self._rejected[priority] += 1
+
+    def leave(self, priority=None):
+        with self._lock:
+            self._inflight -= 1
+            if priority is not None:
+                self._by_class[priority] -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "inflight_requests": self._inflight,
+                "max_inflight_requests": self.max_inflight,
+                "inflight_by_class": dict(self._by_class),
+                "rejected": dict(self._rejected),
+            }
+
+
+# cpu_percent(interval=None) reports usage since the previous call; prime it
+# so scrapes never block.
+psutil.cpu_percent(interval=None)
+
+profiler = Profiler(os.environ.get("PARAKEET_PROFILE_DIR", PROFILE_DIR), PROFILE_MAX_ARTIFACTS,
+                    PROFILE_ARM_TIMEOUT_SECONDS)
+PROFILE_TOKEN = os.environ.get("PARAKEET_PROFILE_TOKEN", "")
+scheduler = BatchScheduler(BATCH_WINDOW_MS / 1000, BATCH_MAX_SIZE, BATCH_MAX_PAD_RATIO,
+                           MAX_QUEUED_CHUNKS)
+admission = AdmissionControl(MAX_INFLIGHT_REQUESTS, BULK_MAX_INFLIGHT)
+if worker_processes > 0:
+    scheduler.listen(*inference_endpoint)
+else:
+    threading.Thread(target=load_models, args=(scheduler,), daemon=True,
+                     name="model-loader").start()
+
+
+def _pump_stream(src, dst):
+    """Copy an upload stream into ffmpeg's stdin, closing it when done."""
+    try:
+        shutil.copyfileobj(src, dst, PIPE_BUFFER_SIZE)
+    except OSError:
+        pass  # ffmpeg exited early; its stderr explains why
+    finally:
+        try:
+            dst.close()
+        except OSError:
+            pass
+
+
+class PcmDecoder:
+    """ffmpeg decoding a path or binary stream to mono 16 kHz float32 PCM.
+
+    Streams are fed to ffmpeg's stdin and the samples are read back from its
+    stdout as the caller asks for them, so nothing is written to disk and
+    only what the caller keeps stays in memory.
+    """
+
+    def __init__(self, source):
+        from_stream = not isinstance(source, str)
+        command = [
+            "ffmpeg", "-hide_banner", "-loglevel", "error",
+            "-i", "pipe:0" if from_stream else source,
+            "-ac", "1", "-ar", str(SAMPLE_RATE),
+            "-f", "f32le", "pipe:1",
+        ]
+        self.proc = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE if from_stream else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        self._stderr = []
+        self._helpers = [threading.Thread(target=lambda: self._stderr.append(self.proc.stderr.read()),
+                                          daemon=True)]
+        if from_stream:
+            self._helpers.append(threading.Thread(target=_pump_stream,
+                                                  args=(source, self.proc.stdin), daemon=True))
+        for t in self._helpers:
+            t.start()
+        self.exhausted = False
+        self._status = None
+
+    def read(self, num_samples=None):
+        """Return up to ``num_samples`` samples, or all that remain if None.
+
+        Fewer samples than asked for means the audio has ended.
+        """
+        if num_samples is None:
+            pcm = self.proc.stdout.read()
+            self.exhausted = True
+        else:
+            pcm = self.proc.stdout.read(num_samples * 4)
+            self.exhausted = len(pcm) < num_samples * 4
+        return np.frombuffer(pcm, dtype=np.float32, count=len(pcm) // 4)
+
+    def close(self):
+        """Stop ffmpeg; True if it decoded the whole input without error."""
+        if self._status is None:
+            if not self.exhausted:
+                self.proc.kill()
+            self.proc.stdout.close()
+            self.proc.wait()
+            for t in self._helpers:
+                t.join()
+            self._status = self.exhausted and self.proc.returncode == 0
+            if self.exhausted and self.proc.returncode != 0:
+                print(f"FFmpeg error: {b''.join(self._stderr).decode(errors='replace')}")
+        return self._status
+
+
+def resample(samples, rate, target_rate):
+    """Band-limited resampling by cropping or zero-padding the spectrum."""
+    target_length = round(len(samples) * target_rate / rate)
+    if len(samples) == 0 or target_length == 0:
+        return np.zeros(0, dtype=np.float32)
+    spectrum = np.fft.rfft(samples)
+    return (np.fft.irfft(spectrum, target_length) * (target_length / len(samples))).astype(np.float32)
+
+
+def pcm_samples(data, encoding, rate, channels):
+    """Convert raw interleaved PCM to mono 16 kHz float32 without ffmpeg."""
+    dtype = np.dtype(PCM_ENCODINGS[encoding])
+    frames = len(data) // (dtype.itemsize * channels)
+    samples = np.frombuffer(data, dtype=dtype, count=frames * channels)
+    if dtype.kind == "i":
+        samples = samples.astype(np.float32) / 32768
+    if channels > 1:
+        samples = samples.reshape(frames, channels).mean(axis=1, dtype=np.float32)
+    if rate != SAMPLE_RATE:
+        samples = resample(samples, rate, SAMPLE_RATE)
+    return samples
+
+
+def map_pcm_file(path):
+    """Memory-map a raw float32 PCM file so chunks can be sliced without copies."""
+    if os.path.getsize(path) < 4:
+        return np.zeros(0, dtype=np.float32)
+    return np.memmap(path, dtype=np.float32, mode="r")
+
+
+def chunk_windows(chunk_boundaries):
+    """Start and end second of each chunk's audio: its span between two
+    boundaries plus half of CHUNK_OVERLAP_SECONDS either side."""
+    half = CHUNK_OVERLAP_SECONDS / 2
+    return [(max(0.0, start - half), min(chunk_boundaries[-1], end + half))
+            for start, end in zip(chunk_boundaries, chunk_boundaries[1:])]
+
+
+def slice_chunks(samples, chunk_boundaries):
+    """Cut one zero-copy view per chunk out of a decoded sample buffer."""
+    return [samples[round(start * SAMPLE_RATE):round(end * SAMPLE_RATE)]
+            for start, end in chunk_windows(chunk_boundaries)]
+
+
+def split_search(chunk_duration):
+    """Silence search window and minimum chunk length for a chunk target.
+
+    The defaults suit minute-long chunks; shorter chunks search nearer their
+    target so splits stay close to the requested length.
+    """
+    return min(SILENCE_SEARCH_WINDOW, chunk_duration / 2), min(MIN_SPLIT_GAP, chunk_duration / 4)
+
+
+def _threshold_amplitude(silence_thresh):
+    """Convert an ffmpeg-style noise threshold ("-40dB" or "0.01") to linear amplitude."""
+    value = str(silence_thresh).strip()
+    if value.lower().endswith("db"):
+        return 10 ** (float(value[:-2]) / 20)
+    return float(value)
+
+
+def detect_silence_points(samples, silence_thresh=SILENCE_THRESHOLD,
+                          silence_duration=SILENCE_MIN_DURATION,
+                          total_duration=None):
+    """Find (start, end) spans where the audio stays below ``silence_thresh``.
+
+    Mirrors ffmpeg's silencedetect at SILENCE_FRAME_SECONDS resolution: a
+    frame is silent when its peak amplitude is under the threshold, and runs
+    of silent frames at least ``silence_duration`` long are reported.
+    """
+    frame = int(SAMPLE_RATE * SILENCE_FRAME_SECONDS)
+    num_frames = len(samples) // frame
+    if num_frames == 0:
         return []
 
+    frames = np.asarray(samples[:num_frames * frame]).reshape(num_frames, frame)
+    peaks = np.maximum(frames.max(axis=1), -frames.min(axis=1))
+    silent = (peaks < _threshold_amplitude(silence_thresh)).astype(np.int8)
+
+    edges = np.diff(np.concatenate(([0], silent, [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    min_frames = math.ceil(silence_duration / SILENCE_FRAME_SECONDS - 1e-9)
+    keep = (ends - starts) >= min_frames
+
+    frame_seconds = frame / SAMPLE_RATE
+    silence_points = [(float(start * frame_seconds), float(end * frame_seconds))
+                      for start, end in zip(starts[keep], ends[keep])]
+    if silence_points and ends[keep][-1] == num_frames and total_duration is not None:
+        silence_points[-1] = (silence_points[-1][0], total_duration)
+    return silence_points
+
 
 def find_optimal_split_points(total_duration, target_chunk_duration,
                                silence_points, search_window=SILENCE_SEARCH_WINDOW,
@@ -195,6 +2007,15 @@ def find_optimal_split_points(total_duration, target_chunk_duration,
     return split_points
 
 
+def clean_text(text):
+    if not text:
+        return ""
+    text = text.replace("\u2581", " ").strip()
+    text = re.sub(r"\s+", " ", text)
+    text = text.replace(" '", "'")
+    return text
+
+
 def format_srt_time(seconds):
     delta = datetime.timedelta(seconds=seconds)
     s = str(delta)
@@ -215,9 +2036,9 @@ def format_srt_time(seconds):
 def segments_to_srt(segments):
     srt_content = []
     for i, segment in enumerate(segments):
-        start_time = format_srt_time(segment["start"])
-        end_time = format_srt_time(segment["end"])
-        text = segment["segment"].strip()
+        start_time = format_srt_time(segment.start)
+        end_time = format_srt_time(segment.end)
+        text = segment.text
         if text:
             srt_content.append(str(i + 1))
             srt_content.append(f"{start_time} --> {end_time}")
@@ -229,9 +2050,9 @@ def segments_to_srt(segments):
 def segments_to_vtt(segments):
     vtt_content = ["WEBVTT", ""]
     for i, segment in enumerate(segments):
-        start_time = format_srt_time(segment["start"]).replace(",", ".")
-        end_time = format_srt_time(segment["end"]).replace(",", ".")
-        text = segment["segment"].strip()
+        start_time = format_srt_time(segment.start).replace(",", ".")
+        end_time = format_srt_time(segment.end).replace(",", ".")
+        text = segment.text
         if text:
             vtt_content.append(f"{start_time} --> {end_time}")
             vtt_content.append(text)
@@ -239,6 +2060,600 @@ def segments_to_vtt(segments):
     return "\n".join(vtt_content)
 
 
+class SpeechTimeline:
+    """Maps times in gated audio back to the chunk it was cut from.
+
+    Kept span ``i`` starts at ``gated_starts[i]`` in the gated audio and at
+    ``original_starts[i]`` in the chunk.
+    """
+
+    def __init__(self, gated_starts, original_starts):
+        self.gated_starts = gated_starts
+        self.original_starts = original_starts
+
+    def to_original(self, times):
+        times = np.asarray(times, dtype=np.float64)
+        span = np.maximum(np.searchsorted(self.gated_starts, times, side="right") - 1, 0)
+        return self.original_starts[span] + (times - self.gated_starts[span])
+
+
+def gate_speech(samples):
+    """Cut long non-speech spans out of a chunk before it is recognized.
+
+    Returns the samples to recognize and a SpeechTimeline for their
+    timestamps, or the chunk unchanged and None when nothing is cut.
+    """
+    duration = len(samples) / SAMPLE_RATE
+    silences = detect_silence_points(samples, VAD_THRESHOLD, VAD_MIN_SILENCE,
+                                     total_duration=duration)
+    cuts = [(round((start + VAD_PADDING) * SAMPLE_RATE), round((end - VAD_PADDING) * SAMPLE_RATE))
+            for start, end in silences if end - start > 2 * VAD_PADDING]
+    if not cuts:
+        return samples, None
+
+    starts = np.array([0] + [end for _, end in cuts])
+    ends = np.array([start for start, _ in cuts] + [len(samples)])
+    gated = np.concatenate([samples[start:end] for start, end in zip(starts, ends)])
+    gated_starts = np.concatenate(([0], np.cumsum(ends - starts)[:-1]))
+    with transcribed_lock:
+        transcribed["gated_seconds"] += (len(samples) - len(gated)) / SAMPLE_RATE
+    return gated, SpeechTimeline(gated_starts / SAMPLE_RATE, starts / SAMPLE_RATE)
+
+
+def gate_chunks(chunk_inputs):
+    """Speech-gate every chunk if enabled; returns the inputs and their timelines."""
+    if not VAD_GATING:
+        return chunk_inputs, [None] * len(chunk_inputs)
+    with timed("vad"):
+        gated = [gate_speech(samples) for samples in chunk_inputs]
+    return [samples for samples, _ in gated], [timeline for _, timeline in gated]
+
+
+Segment = collections.namedtuple("Segment", "start end text first_word end_word")
+SENTENCE_END = re.compile(r"[.?!\u2026][\"')\]]*$")
+
+
+class Transcript:
+    """Timed tokens stored by column rather than as a dict per token.
+
+    Token ``i`` is ``text[offsets[i]:offsets[i + 1]]`` and spans ``starts[i]``
+    to ``ends[i]`` seconds on the file timeline; a token that opens a word
+    keeps its leading "\u2581". Words and sentence segments are derived from
+    these columns when the transcript is rendered.
+    """
+
+    def __init__(self, text, offsets, starts, ends, duration=None):
+        self.text = text
+        self.offsets = offsets
+        self.starts = starts
+        self.ends = ends
+        self.duration = duration
+
+    @classmethod
+    def from_result(cls, result, chunk_offset, timeline=None):
+        """Place one chunk's recognition result on the file timeline.
+
+        Timestamps of a speech-gated chunk are first mapped back through its
+        ``timeline``. Returns None for a chunk with no speech.
+        """
+        if not result or not result.text or not len(result.tokens):
+            return None
+        timestamps = np.asarray(result.timestamps, dtype=np.float64)
+        if timeline is not None:
+            timestamps = timeline.to_original(timestamps)
+        starts = timestamps + chunk_offset
+        offsets = np.zeros(len(result.tokens) + 1, dtype=np.int64)
+        np.cumsum([len(token) for token in result.tokens], out=offsets[1:])
+        return cls("".join(result.tokens), offsets, starts,
+                   np.append(starts[1:], starts[-1] + TOKEN_FRAME_SECONDS))
+
+    @classmethod
+    def concat(cls, parts, duration=None):
+        parts = [part for part in parts if part is not None]
+        if not parts:
+            return cls("", np.zeros(1, dtype=np.int64), np.zeros(0), np.zeros(0), duration)
+        bases = np.cumsum([0] + [len(part.text) for part in parts[:-1]])
+        offsets = np.concatenate([parts[0].offsets[:1]]
+                                 + [part.offsets[1:] + base for part, base in zip(parts, bases)])
+        return cls("".join(part.text for part in parts), offsets,
+                   np.concatenate([part.starts for part in parts]),
+                   np.concatenate([part.ends for part in parts]), duration)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["text"], np.array(data["offsets"], dtype=np.int64),
+                   np.array(data["starts"], dtype=np.float64),
+                   np.array(data["ends"], dtype=np.float64), data["duration"])
+
+    def to_dict(self):
+        return {"duration": self.duration, "text": self.text, "offsets": self.offsets.tolist(),
+                "starts": np.round(self.starts, 3).tolist(),
+                "ends": np.round(self.ends, 3).tolist()}
+
+    def __len__(self):
+        return len(self.starts)
+
+    @property
+    def nbytes(self):
+        return len(self.text) + self.offsets.nbytes + self.starts.nbytes + self.ends.nbytes
+
+    def tail(self, token):
+        """The transcript from token index ``token`` on."""
+        base = self.offsets[token]
+        return Transcript(self.text[base:], self.offsets[token:] - base,
+                          self.starts[token:], self.ends[token:], self.duration)
+
+    def word_opens(self):
+        """Boolean mask of the tokens that start a word."""
+        codes = np.frombuffer(self.text.encode("utf-32-le"), dtype=np.uint32)
+        firsts = self.offsets[:-1]
+        opens = np.diff(self.offsets) > 0
+        opens[opens] = codes[firsts[opens]] == 0x2581
+        if len(opens):
+            opens[0] = True
+        return opens
+
+    def _word_index(self, seconds):
+        """Index of the first token that starts a word at or after ``seconds``."""
+        later = np.flatnonzero(self.word_opens() & (self.starts >= seconds))
+        return int(later[0]) if len(later) else len(self)
+
+    def before(self, seconds):
+        """The words starting before ``seconds``, or None if there are none."""
+        token = self._word_index(seconds)
+        if not token:
+            return None
+        return Transcript(self.text[:self.offsets[token]], self.offsets[:token + 1],
+                          self.starts[:token], self.ends[:token], self.duration)
+
+    def since(self, seconds):
+        """The words starting at or after ``seconds``, or None if there are none."""
+        token = self._word_index(seconds)
+        return self.tail(token) if token < len(self) else None
+
+    def words(self):
+        """Group tokens into words at each "\u2581".
+
+        Returns the word texts and arrays of each word's first and last
+        token index; empty words (a bare "\u2581") are dropped.
+        """
+        count = len(self)
+        if not count:
+            return [], np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        first = np.flatnonzero(self.word_opens())
+        last = np.append(first[1:], count) - 1
+        bounds = self.offsets[np.append(first, count)].tolist()
+        texts = [self.text[a:b].replace("\u2581", " ").strip()
+                 for a, b in zip(bounds[:-1], bounds[1:])]
+        keep = np.array([bool(text) for text in texts])
+        if not keep.all():
+            texts = [text for text in texts if text]
+            first, last = first[keep], last[keep]
+        return texts, first, last
+
+    def segments(self):
+        """Cut the words into sentence segments in one pass.
+
+        Returns the Segments, which index into the returned words.
+        """
+        texts, first, last = self.words()
+        word_starts, word_ends = self.starts[first].tolist(), self.ends[last].tolist()
+        # A pause runs from the onset of a word's last token to the next word.
+        onsets = self.starts[last].tolist()
+        segments = []
+        opened = 0
+        for i, text in enumerate(texts):
+            if (i + 1 == len(texts) or SENTENCE_END.search(text)
+                    or word_starts[i + 1] - onsets[i] > SEGMENT_MAX_GAP
+                    or word_ends[i] - word_starts[opened] >= SEGMENT_MAX_SECONDS):
+                segments.append(Segment(word_starts[opened], word_ends[i],
+                                        clean_text(" ".join(texts[opened:i + 1])), opened, i + 1))
+                opened = i + 1
+        return segments, (texts, first, word_starts, word_ends)
+
+
+def word_dicts(words, segment=None):
+    """Word timings as JSON-ready dicts, for all words or one segment's."""
+    texts, _, starts, ends = words
+    lo, hi = (0, len(texts)) if segment is None else (segment.first_word, segment.end_word)
+    return [{"start": starts[i], "end": ends[i], "word": texts[i]} for i in range(lo, hi)]
+
+
+def collect_segments(job_id, futures, chunk_boundaries, timelines):
+    """Yield each chunk's Transcript (None if silent) in order as it finishes.
+
+    Chunks may finish on different workers in any order; results are
+    consumed in submission order and placed on the timeline by their own
+    window start rather than a running sum.
+    """
+    windows = chunk_windows(chunk_boundaries)
+    recognized = ((chunk_boundaries[i],
+                   Transcript.from_result(future.result(), windows[i][0], timelines[i]))
+                  for i, future in enumerate(futures))
+    for i, piece in enumerate(merge_overlaps(recognized)):
+        jobs.progress(job_id, i + 1, piece and clean_text(piece.text))
+        yield piece
+
+
+def overlap_cut(previous, boundary):
+    """Time at which to switch from ``previous`` to the chunk after ``boundary``.
+
+    Picks the longest pause between two of ``previous``'s words within a
+    quarter of the overlap of the boundary, away from either chunk's edge,
+    and cuts halfway through it. Falls back to the boundary itself.
+    """
+    if previous is None:
+        return boundary
+    opens = np.flatnonzero(previous.word_opens()[1:]) + 1
+    onsets, starts = previous.starts[opens - 1], previous.starts[opens]
+    middles = (onsets + starts) / 2
+    near = np.abs(middles - boundary) <= CHUNK_OVERLAP_SECONDS / 4
+    if not near.any():
+        return boundary
+    return float(middles[near][np.argmax((starts - onsets)[near])])
+
+
+def merge_overlaps(chunks):
+    """Keep each word of overlapping chunks once.
+
+    ``chunks`` yields ``(boundary, transcript)`` in order, ``boundary`` being
+    the split point the chunk's audio was extended back across. Adjacent
+    transcripts are cut at overlap_cut: words starting before it come from
+    the earlier chunk, the rest from the later one. Cuts never move back, so
+    a chunk shorter than the overlap cannot repeat words. Each chunk's
+    transcript (None if nothing is left) is yielded once the next chunk has
+    settled its end; without an overlap they pass straight through.
+    """
+    try:
+        if not CHUNK_OVERLAP_SECONDS:
+            for _, piece in chunks:
+                yield piece
+            return
+        previous = floor = None
+        i = -1
+        for i, (boundary, piece) in enumerate(chunks):
+            if i:
+                cut = overlap_cut(previous, boundary)
+                if floor is not None:
+                    cut = max(cut, floor)
+                yield previous and previous.before(cut)
+                piece = piece and piece.since(cut)
+                floor = cut
+            previous = piece
+        if i >= 0:
+            yield previous
+    finally:
+        chunks.close()
+
+
+def collect_windowed_segments(job_id, audio, priority):
+    """Yield each chunk's Transcript of a WindowedAudio, in order.
+
+    Chunks are submitted as they are cut, at most WINDOWED_MAX_INFLIGHT_CHUNKS
+    ahead of the one being collected, so decoding only runs as far ahead of
+    recognition as that bound allows. The job's chunk total is filled in once
+    the decoder reaches the end of the audio.
+    """
+    chunks = iter(audio)
+    pending = collections.deque()
+    collected = 0
+
+    def collect():
+        nonlocal collected
+        boundary, offset, timeline, future = pending.popleft()
+        collected += 1
+        return boundary, Transcript.from_result(future.result(), offset, timeline)
+
+    def recognized():
+        try:
+            for offset, samples, boundary in chunks:
+                [samples], [timeline] = gate_chunks([samples])
+                pending.append((boundary, offset, timeline,
+                                submit_chunks([samples], priority)[0]))
+                if len(pending) >= WINDOWED_MAX_INFLIGHT_CHUNKS:
+                    yield collect()
+            jobs.start(job_id, total_chunks=collected + len(pending))
+            while pending:
+                yield collect()
+        finally:
+            for _, _, _, future in pending:
+                future.cancel()
+            chunks.close()
+
+    merged = merge_overlaps(recognized())
+    try:
+        for i, piece in enumerate(merged):
+            jobs.progress(job_id, i + 1, piece and clean_text(piece.text))
+            yield piece
+    finally:
+        merged.close()
+
+
+STREAM_MIMETYPES = {"sse": "text/event-stream", "ndjson": "application/x-ndjson"}
+
+
+def requested_stream_mode():
+    """Pick SSE or NDJSON from the ``stream`` field or the Accept header."""
+    stream = request.values.get("stream", "").lower()
+    if stream in STREAM_MIMETYPES:
+        return stream
+    if stream in ("true", "1"):
+        return "sse"
+    if stream in ("false", "0"):
+        return None
+    best = request.accept_mimetypes.best_match(
+        ["application/json", *STREAM_MIMETYPES.values()])
+    for mode, mimetype in STREAM_MIMETYPES.items():
+        if best == mimetype:
+            return mode
+    return None
+
+
+def format_event(mode, event, payload):
+    if mode == "sse":
+        return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+    return json.dumps({"type": event, **payload}) + "\n"
+
+
+def transcript_result(chunk_transcripts, total_duration):
+    return Transcript.concat(list(chunk_transcripts), total_duration)
+
+
+def stream_segments(mode, job_id, chunk_transcripts, total_duration, num_chunks, priority,
+                    cache_key=None, started=None, windowed=None):
+    """Emit the job id first, then each sentence segment once it is complete.
+
+    A chunk's last sentence may continue into the next chunk, so it is held
+    back and re-cut together with that chunk; the greedy cut restarts at a
+    segment boundary, so the streamed segments match a buffered response.
+    For ``windowed`` audio the duration and chunk count are not known until
+    the last window is decoded; the job event carries None for both.
+    """
+    yield format_event(mode, "job", {
+        "job_id": job_id,
+        "duration": total_duration,
+        "total_chunks": num_chunks,
+        "priority": priority,
+    })
+    parts, texts = [], []
+    pending = None
+    chunk = 0
+
+    def emit(segments, words):
+        for segment in segments:
+            texts.append(segment.text)
+            yield format_event(mode, "segment", {
+                "id": len(texts) - 1,
+                "chunk": chunk,
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text,
+                "words": word_dicts(words, segment),
+            })
+
+    try:
+        for chunk, piece in enumerate(chunk_transcripts):
+            if piece is None:
+                continue
+            parts.append(piece)
+            pending = Transcript.concat([pending, piece])
+            segments, words = pending.segments()
+            if not segments:
+                continue  # no words yet (silence, or a bare word marker)
+            yield from emit(segments[:-1], words)
+            pending = pending.tail(words[1][segments[-1].first_word])
+        if pending is not None:
+            yield from emit(*pending.segments())
+    except Exception as e:
+        print(f"[{job_id}] Error during streamed processing: {e}")
+        jobs.fail(job_id, str(e))
+        yield format_event(mode, "error", {"error": "Internal server error"})
+        return
+    print(f"[{job_id}] All chunks transcribed and streamed.")
+    if windowed is not None:
+        total_duration = windowed.duration
+    jobs.complete(job_id)
+    if started is not None:
+        record_transcription(started, total_duration)
+    if cache_key:
+        transcripts.put(cache_key, Transcript.concat(parts, total_duration))
+    yield format_event(mode, "done", {
+        "job_id": job_id,
+        "duration": total_duration,
+        "text": " ".join(texts),
+        "segments": len(texts),
+    })
+
+
+def event_stream(mode, events, job_id):
+    response = Response(events, mimetype=STREAM_MIMETYPES[mode])
+    response.headers["X-Job-ID"] = job_id
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def decode_file(job_id, path, pcm_path, temp_files):
+    """Decode a saved upload to ``pcm_path`` and memory-map it.
+
+    The file is added to ``temp_files`` for the caller to remove. Returns
+    None if ffmpeg rejects the upload.
+    """
+    print(f"[{job_id}] Converting '{os.path.basename(path)}' to raw 16 kHz PCM...")
+    ffmpeg_command = [
+        "ffmpeg", "-nostdin", "-y",
+        "-i", path,
+        "-ac", "1", "-ar", str(SAMPLE_RATE),
+        "-f", "f32le", pcm_path,
+    ]
+    result = subprocess.run(ffmpeg_command, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"FFmpeg error: {result.stderr}")
+        return None
+    temp_files.append(pcm_path)
+    return map_pcm_file(pcm_path)
+
+
+def load_audio(job_id, source, pcm_path, temp_files):
+    """Start decoding an upload, given as a stream or a saved path.
+
+    Returns the samples, a WindowedAudio if the audio runs past
+    WINDOWED_MIN_SECONDS, or None if ffmpeg rejects the upload.
+    """
+    if not PIPE_DECODE:
+        return decode_file(job_id, source, pcm_path, temp_files)
+    decoder = PcmDecoder(source)
+    head = decoder.read(int(WINDOWED_MIN_SECONDS * SAMPLE_RATE) + 1)
+    if len(head) > WINDOWED_MIN_SECONDS * SAMPLE_RATE:
+        return WindowedAudio(decoder, head)
+    return head if decoder.close() else None
+
+
+class WindowedAudio:
+    """Long audio decoded and cut into chunks one window at a time.
+
+    Iterating yields ``(offset, samples, boundary)`` per chunk: where its
+    audio starts, the audio, and the split it begins at, which differ by the
+    overlap reaching back (see chunk_windows). Each split is chosen like
+    plan_chunks does for a whole file, the silence nearest CHUNK_SECONDS past
+    the previous split, but only the next window of PCM is decoded to find
+    it. ``duration`` counts the audio decoded so far, so it is final once
+    iteration ends.
+    """
+
+    def __init__(self, decoder, head):
+        self.decoder = decoder
+        self.duration = len(head) / SAMPLE_RATE
+        self._head = head
+
+    def __iter__(self):
+        chunk_duration = CHUNK_SECONDS
+        search_window, min_gap = split_search(chunk_duration)
+        chunk = int(chunk_duration * SAMPLE_RATE)
+        half = round(CHUNK_OVERLAP_SECONDS / 2 * SAMPLE_RATE)
+        window = int((chunk_duration + search_window) * SAMPLE_RATE) + half
+        buffer, self._head = self._head, None
+        behind = buffer[:0]
+        offset = 0
+        try:
+            while len(buffer):
+                if len(buffer) < window and not self.decoder.exhausted:
+                    more = self.decoder.read(window - len(buffer))
+                    self.duration += len(more) / SAMPLE_RATE
+                    buffer = np.concatenate((buffer, more))
+                if len(buffer) <= chunk and self.decoder.exhausted:
+                    split = len(buffer)
+                else:
+                    view = buffer[:window - half]
+                    with timed("silence"):
+                        silence_points = detect_silence_points(
+                            view, total_duration=len(view) / SAMPLE_RATE)
+                    with timed("chunking"):
+                        split_points = find_optimal_split_points(
+                            len(view) / SAMPLE_RATE, chunk_duration, silence_points,
+                            search_window=search_window, min_gap=min_gap)
+                    split = round((split_points[0] if split_points else chunk_duration)
+                                  * SAMPLE_RATE)
+                samples = buffer[:split + half]
+                if len(behind):
+                    samples = np.concatenate((behind, samples))
+                yield (offset - len(behind)) / SAMPLE_RATE, samples, offset / SAMPLE_RATE
+                behind = buffer[max(0, split - half):split] if half else buffer[:0]
+                buffer = buffer[split:]
+                offset += split
+            if not self.decoder.close():
+                raise RuntimeError("File conversion failed")
+        finally:
+            self.decoder.close()
+
+
+def plan_chunks(job_id, samples):
+    """Return the audio duration and chunk boundaries, split at silences."""
+    total_duration = len(samples) / SAMPLE_RATE
+    chunk_duration = CHUNK_SECONDS
+    split_points = []
+
+    if total_duration > chunk_duration:
+        print(f"[{job_id}] Detecting silence points for intelligent chunking...")
+        with timed("silence"):
+            silence_points = detect_silence_points(samples, total_duration=total_duration)
+
+        if silence_points:
+            print(f"[{job_id}] Found {len(silence_points)} silence periods")
+            with timed("chunking"):
+                search_window, min_gap = split_search(chunk_duration)
+                split_points = find_optimal_split_points(
+                    total_duration, chunk_duration, silence_points,
+                    search_window=search_window, min_gap=min_gap
+                )
+            print(f"[{job_id}] Optimal split points: {[f'{sp:.2f}s' for sp in split_points]}")
+        else:
+            print(f"[{job_id}] No silence detected, using time-based chunking")
+
+    if split_points:
+        return total_duration, [0.0] + split_points + [total_duration]
+    num_chunks = math.ceil(total_duration / chunk_duration)
+    return total_duration, [min(i * chunk_duration, total_duration)
+                            for i in range(num_chunks + 1)]
+
+
+def transcript_body(result, response_format, word_timestamps=False):
+    """Format a Transcript as a string, or for the JSON formats a dict."""
+    segments, words = result.segments()
+    total_duration = result.duration
+    full_text = " ".join(seg.text for seg in segments)
+
+    if response_format == "srt":
+        return segments_to_srt(segments)
+    elif response_format == "vtt":
+        return segments_to_vtt(segments)
+    elif response_format == "text":
+        return full_text
+    elif response_format == "verbose_json":
+        verbose = {
+            "task": "transcribe",
+            "language": "english",
+            "duration": total_duration,
+            "text": full_text,
+            "segments": [
+                {
+                    "id": idx,
+                    "seek": 0,
+                    "start": seg.start,
+                    "end": seg.end,
+                    "text": seg.text,
+                    "tokens": [],
+                    "temperature": 0.0,
+                    "avg_logprob": 0.0,
+                    "compression_ratio": 0.0,
+                    "no_speech_prob": 0.0,
+                }
+                for idx, seg in enumerate(segments)
+            ],
+        }
+        if word_timestamps:
+            verbose["words"] = word_dicts(words)
+        return verbose
+    else:
+        return {"text": full_text}
+
+
+def render_transcript(result, response_format, job_id, word_timestamps=False):
+    body = transcript_body(result, response_format, word_timestamps)
+    if isinstance(body, str):
+        return Response(body, mimetype="text/plain")
+    response = jsonify(body)
+    if response_format == "json":
+        response.headers['X-Job-ID'] = job_id
+    return response
+
+
+def overloaded(message, retry_after):
+    response = jsonify({"error": message})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(retry_after)
+    return response
+
+
 @app.route("/")
 def index():
     return render_template("index.html")
@@ -246,9 +2661,27 @@ def index():
 
 @app.route("/health")
 def health():
-    return jsonify(
-        {"status": "healthy", "model": "parakeet-tdt-0.6b-v3", "quantization": "int8"}
-    )
+    return readiness()
+
+
+@app.route("/health/live")
+def liveness():
+    return jsonify({"status": "alive",
+                    "uptime_seconds": round(time.time() - process_started, 1)})
+
+
+@app.route("/health/ready")
+def readiness():
+    workers = scheduler.workers
+    body = {
+        "status": "healthy" if workers else "loading",
+        "model": "parakeet-tdt-0.6b-v3",
+        "quantization": "int8",
+        "workers": workers,
+        **startup,
+        "config": tuning,
+    }
+    return jsonify(body), 200 if workers else 503
 
 
 @app.route("/openapi.json")
@@ -265,6 +2698,14 @@ def openapi_spec():
                 "post": {
                     "summary": "Transcribe Audio",
                     "operationId": "transcribe_audio",
+                    "parameters": [
+                        {
+                            "name": "profile",
+                            "in": "query",
+                            "description": "Record a span trace of this request; the X-Profile-Trace header gives its download path",
+                            "schema": {"type": "boolean", "default": False}
+                        }
+                    ],
                     "requestBody": {
                         "content": {
                             "multipart/form-data": {
@@ -285,10 +2726,47 @@ def openapi_spec():
                                             "type": "string",
                                             "default": "json",
                                             "enum": ["json", "text", "srt", "verbose_json", "vtt"]
+                                        },
+                                        "priority": {
+                                            "type": "string",
+                                            "enum": ["interactive", "bulk"],
+                                            "description": "Scheduling class; defaults to interactive for clips up to 30 s."
+                                        },
+                                        "timestamp_granularities[]": {
+                                            "type": "array",
+                                            "items": {"type": "string", "enum": ["word", "segment"]},
+                                            "description": "Include word-level timestamps in verbose_json when 'word' is given."
+                                        },
+                                        "stream": {
+                                            "type": "string",
+                                            "enum": ["sse", "ndjson", "true", "false"],
+                                            "description": "Send job, segment and done events as each chunk completes instead of one response; also selected by an Accept header of text/event-stream or application/x-ndjson."
+                                        },
+                                        "encoding": {
+                                            "type": "string",
+                                            "enum": ["s16le", "f32le"],
+                                            "description": "Declare the file as raw little-endian PCM, decoded without ffmpeg; requires sample_rate."
+                                        },
+                                        "sample_rate": {
+                                            "type": "integer",
+                                            "description": "Sample rate of a raw PCM file; resampled to 16 kHz if different."
+                                        },
+                                        "channels": {
+                                            "type": "integer",
+                                            "default": 1,
+                                            "description": "Interleaved channels of a raw PCM file, averaged to mono."
                                         }
                                     },
                                     "required": ["file"]
                                 }
+                            },
+                            "audio/L16": {
+                                "schema": {"type": "string", "format": "binary"},
+                                "description": "Raw little-endian PCM16 body, e.g. audio/L16;rate=16000;channels=1. Other fields go in the query string."
+                            },
+                            "audio/pcm": {
+                                "schema": {"type": "string", "format": "binary"},
+                                "description": "Raw little-endian PCM body, e.g. audio/pcm;encoding=f32le;rate=48000;channels=2. Other fields go in the query string."
                             }
                         }
                     },
@@ -303,9 +2781,99 @@ def openapi_spec():
                                             "text": {"type": "string"}
                                         }
                                     }
+                                },
+                                "text/event-stream": {
+                                    "schema": {"type": "string"}
+                                },
+                                "application/x-ndjson": {
+                                    "schema": {"type": "string"}
+                                }
+                            }
+                        },
+                        "503": {
+                            "description": "Server overloaded; retry after the Retry-After header"
+                        }
+                    }
+                }
+            },
+            "/v1/audio/transcriptions/jobs": {
+                "post": {
+                    "summary": "Submit Transcription Job",
+                    "operationId": "submit_job",
+                    "description": "Accepts the same file and priority fields as /v1/audio/transcriptions (priority defaults to bulk) and returns a job id immediately.",
+                    "requestBody": {
+                        "content": {
+                            "multipart/form-data": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "file": {"type": "string", "format": "binary"},
+                                        "priority": {"type": "string", "enum": ["interactive", "bulk"]}
+                                    },
+                                    "required": ["file"]
                                 }
                             }
                         }
+                    },
+                    "responses": {
+                        "202": {"description": "Job queued; the Location header points at its status"},
+                        "503": {"description": "Job queue is full; retry after the Retry-After header"}
+                    }
+                }
+            },
+            "/v1/audio/transcriptions/bulk": {
+                "post": {
+                    "summary": "Submit Transcription Jobs in Bulk",
+                    "operationId": "submit_bulk",
+                    "description": "Queues each file part as its own job, as /v1/audio/transcriptions/jobs would, and returns their ids.",
+                    "requestBody": {
+                        "content": {
+                            "multipart/form-data": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "file": {"type": "array",
+                                                 "items": {"type": "string", "format": "binary"}},
+                                        "priority": {"type": "string", "enum": ["interactive", "bulk"]}
+                                    },
+                                    "required": ["file"]
+                                }
+                            }
+                        }
+                    },
+                    "responses": {
+                        "202": {"description": "Jobs queued; one entry per file with its id and status"},
+                        "413": {"description": "More than MAX_BULK_FILES files"},
+                        "503": {"description": "Job queue is full; retry after the Retry-After header"}
+                    }
+                }
+            },
+            "/v1/audio/transcriptions/jobs/{job_id}": {
+                "get": {
+                    "summary": "Get Job Status",
+                    "operationId": "get_job",
+                    "responses": {
+                        "200": {"description": "Job state (queued, processing, complete or failed) and progress"},
+                        "404": {"description": "Unknown or expired job"}
+                    }
+                }
+            },
+            "/v1/audio/transcriptions/jobs/{job_id}/result": {
+                "get": {
+                    "summary": "Fetch Job Result",
+                    "operationId": "get_job_result",
+                    "parameters": [
+                        {
+                            "name": "response_format",
+                            "in": "query",
+                            "schema": {"type": "string", "default": "json",
+                                       "enum": ["json", "text", "srt", "verbose_json", "vtt"]}
+                        }
+                    ],
+                    "responses": {
+                        "200": {"description": "Transcript in the requested format"},
+                        "409": {"description": "Job has not finished yet"},
+                        "410": {"description": "Result was evicted from the result store"}
                     }
                 }
             }
@@ -315,253 +2883,1053 @@ def openapi_spec():
 
 @app.route("/progress/<job_id>")
 def get_progress(job_id):
-    if job_id in progress_tracker:
-        return jsonify(progress_tracker[job_id])
+    job = jobs.get(job_id)
+    if job is not None:
+        return jsonify(job)
     return jsonify({"status": "not_found"}), 404
 
 
 @app.route("/status")
 def get_status():
-    for job_id, progress in progress_tracker.items():
-        if progress.get("status") == "processing":
-            return jsonify({"job_id": job_id, **progress})
-    return jsonify({"status": "idle"})
+    queues = {"admission": admission.stats(), "jobs": jobs.stats(),
+              **scheduler.queue_stats()}
+    job_id, job = jobs.oldest("processing")
+    if job is not None:
+        return jsonify({"job_id": job_id, **job, "queues": queues})
+    return jsonify({"status": "idle", "queues": queues})
 
 
-@app.route("/metrics")
-def get_metrics():
-    cpu_percent = psutil.cpu_percent(interval=0.1)
+@app.route("/stats")
+def get_stats():
+    cpu_percent = psutil.cpu_percent(interval=None)
     memory = psutil.virtual_memory()
     return jsonify({
         "cpu_percent": cpu_percent,
         "ram_percent": memory.percent,
         "ram_used_gb": round(memory.used / (1024**3), 2),
-        "ram_total_gb": round(memory.total / (1024**3), 2)
+        "ram_total_gb": round(memory.total / (1024**3), 2),
+        "batching": scheduler.stats(),
+        "cache": transcripts.stats(),
     })
 
 
-@app.route("/v1/audio/transcriptions", methods=["POST"])
-def transcribe_audio():
-    evict_stale_progress()
-    if "file" not in request.files:
-        return jsonify({"error": "No file part in the request"}), 400
-    file = request.files["file"]
-    if not file or not file.filename:
-        return jsonify({"error": "No file selected"}), 400
+def prometheus_metrics():
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            lines.append(f"{name}{_labels(**labels)} {value}")
+
+    for histogram in (stage_seconds, queue_wait_seconds, realtime_factor):
+        lines.extend(histogram.render())
+
+    with transcribed_lock:
+        audio_seconds = transcribed["audio_seconds"]
+        transcriptions = transcribed["transcriptions"]
+        gated_seconds = transcribed["gated_seconds"]
+    metric("parakeet_audio_seconds_total", "counter",
+           "Seconds of audio transcribed, excluding cache hits.", [({}, audio_seconds)])
+    metric("parakeet_transcriptions_total", "counter",
+           "Transcriptions completed, excluding cache hits.", [({}, transcriptions)])
+    metric("parakeet_gated_audio_seconds_total", "counter",
+           "Seconds of non-speech cut out before recognition.", [({}, gated_seconds)])
+
+    admitted = admission.stats()
+    metric("parakeet_inflight_requests", "gauge",
+           "Synchronous transcription requests in progress.",
+           [({}, admitted["inflight_requests"])])
+    metric("parakeet_rejected_requests_total", "counter",
+           "Requests answered with 503 by admission control.",
+           [({"priority": name}, count) for name, count in admitted["rejected"].items()])
+
+    queues = scheduler.queue_stats()
+    metric("parakeet_queued_chunks", "gauge", "Chunks waiting for inference.",
+           [({"priority": name}, queue["queued_chunks"]) for name, queue in queues.items()])
+    batching = scheduler.stats()
+    metric("parakeet_inference_workers", "gauge", "Inference workers attached.",
+           [({}, batching["workers"])])
+    metric("parakeet_batches_total", "counter", "Batched recognize() calls.",
+           [({}, batching["batches"])])
+    metric("parakeet_chunks_total", "counter", "Chunks recognized.",
+           [({}, batching["chunks"])])
+
+    job_counts = jobs.stats()
+    metric("parakeet_jobs", "gauge", "Tracked transcription jobs by state.",
+           [({"state": state}, job_counts[state]) for state in JobStore.STATES])
+
+    cache = transcripts.stats()
+    metric("parakeet_cache_hits_total", "counter", "Transcript cache hits.",
+           [({"tier": "memory"}, cache["memory_hits"]), ({"tier": "disk"}, cache["disk_hits"])])
+    metric("parakeet_cache_misses_total", "counter", "Transcript cache misses.",
+           [({}, cache["misses"])])
+    metric("parakeet_cache_bytes", "gauge", "Transcript cache size.",
+           [({"tier": "memory"}, cache["memory_bytes"]), ({"tier": "disk"}, cache["disk_bytes"])])
+
+    server = psutil.Process()
+    processes = [server, *server.children(recursive=True)]
+    rss = 0
+    for process in processes:
+        try:
+            rss += process.memory_info().rss
+        except psutil.Error:
+            pass  # worker exited between listing and sampling
+    metric("process_resident_memory_bytes", "gauge",
+           "Resident memory of the server and its inference processes.", [({}, rss)])
 
-    response_format = request.form.get("response_format", "json")
-    if response_format not in {"json", "text", "srt", "verbose_json", "vtt"}:
-        response_format = "json"
+    memory = psutil.virtual_memory()
+    metric("parakeet_cpu_percent", "gauge", "Host CPU utilisation since the previous scrape.",
+           [({}, psutil.cpu_percent(interval=None))])
+    metric("parakeet_memory_used_bytes", "gauge", "Host memory in use.",
+           [({}, memory.used)])
+    return "\n".join(lines) + "\n"
+
+
+@app.route("/metrics")
+def get_metrics():
+    return Response(prometheus_metrics(), mimetype="text/plain; version=0.0.4")
+
+
+def requested_pcm_format():
+    """The ``(encoding, rate, channels)`` of a raw PCM upload, or None.
+
+    Raw PCM is declared by the body's Content-Type (``audio/L16`` is s16le,
+    ``audio/pcm`` takes an ``encoding`` parameter) or by ``encoding``,
+    ``sample_rate`` and ``channels`` form fields next to the file. Raises
+    ValueError for a declaration that cannot be decoded.
+    """
+    if request.mimetype in PCM_MIMETYPES:
+        params = request.mimetype_params
+        encoding = "s16le" if request.mimetype == "audio/l16" else params.get("encoding", "s16le")
+        rate, channels = params.get("rate"), params.get("channels", 1)
+    elif request.form.get("encoding"):
+        encoding = request.form["encoding"]
+        rate, channels = request.form.get("sample_rate"), request.form.get("channels", 1)
+    else:
+        return None
+    encoding = encoding.lower()
+    if encoding not in PCM_ENCODINGS:
+        raise ValueError(f"Unsupported PCM encoding '{encoding}', expected s16le or f32le")
+    try:
+        rate, channels = int(rate), int(channels)
+    except (TypeError, ValueError):
+        raise ValueError("Raw PCM needs an integer sample rate and channel count")
+    if not 1000 <= rate <= 384000 or not 1 <= channels <= 32:
+        raise ValueError(f"Unsupported PCM layout: {rate} Hz, {channels} channel(s)")
+    return encoding, rate, channels
+
+
+def validate_upload(file=None):
+    """Return the upload, its sanitized name and extension, or an error response.
+
+    Checks the request's ``file`` part unless a ``file`` is given.
+    """
+    if file is None:
+        if "file" not in request.files:
+            return None, (jsonify({"error": "No file part in the request"}), 400)
+        file = request.files["file"]
+    if not file or not file.filename:
+        return None, (jsonify({"error": "No file selected"}), 400)
 
     original_filename = secure_filename(file.filename)
-    allowed_ext = {".wav", ".mp3", ".m4a", ".ogg", ".flac", ".mp4", ".webm",
-                   ".aac", ".wma", ".opus", ".mkv", ".avi", ".mov"}
     ext = os.path.splitext(original_filename)[1].lower()
-    if ext not in allowed_ext:
-        return jsonify({"error": f"Unsupported file type: {ext}"}), 415
+    if ext not in ALLOWED_EXTENSIONS:
+        return None, (jsonify({"error": f"Unsupported file type: {ext}"}), 415)
+    return (file, original_filename, ext), None
+
+
+def profile_authorized():
+    """True if profiling is enabled and the request carries its bearer token."""
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+    return bool(PROFILE_TOKEN) and hmac.compare_digest(supplied.encode(), PROFILE_TOKEN.encode())
+
+
+def profile_denied():
+    """404 while profiling is disabled, 401 without its token, else None."""
+    if not PROFILE_TOKEN:
+        flask.abort(404)
+    if not profile_authorized():
+        return jsonify({"error": "Profiling needs the PARAKEET_PROFILE_TOKEN bearer token"}), 401
+    return None
+
+
+def traced(view):
+    """Trace the request if it asks with ?profile=1 and the token, or a trace is armed.
+
+    The trace is saved once the response has been sent, so a streamed
+    response's inference spans are included.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        asked = request.args.get("profile") in ("1", "true") and profile_authorized()
+        if not asked and not profiler.take_request():
+            return view(*args, **kwargs)
+        trace = Trace(f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}")
+        tracing.trace = trace
+        try:
+            with trace.span(request.endpoint):
+                response = app.make_response(view(*args, **kwargs))
+        finally:
+            tracing.trace = None
+        returned = time.perf_counter()
+
+        def save():
+            trace.add("send", returned, time.perf_counter())
+            profiler.save_trace(trace)
+
+        response.headers["X-Profile-Trace"] = f"/debug/profile/trace-{trace.name}.json"
+        response.call_on_close(save)
+        return response
+    return wrapper
+
+
+@app.route("/debug/profile", methods=["GET", "POST"])
+def debug_profile():
+    """Arm request traces and ORT profiling, and list the artifacts."""
+    denied = profile_denied()
+    if denied:
+        return denied
+    if request.method == "POST":
+        requests_count = request.values.get("requests", type=int)
+        inferences = request.values.get("inferences", type=int)
+        if not requests_count and not inferences:
+            return jsonify({"error": "Give a positive requests or inferences count"}), 400
+        if requests_count:
+            profiler.arm_requests(min(requests_count, PROFILE_MAX_REQUESTS))
+        if inferences:
+            error = profiler.arm_inferences(min(inferences, PROFILE_MAX_INFERENCES))
+            if error:
+                return jsonify({"error": error, **profiler.status()}), 409
+    return jsonify(profiler.status())
+
+
+@app.route("/debug/profile/<name>")
+def debug_profile_artifact(name):
+    denied = profile_denied()
+    if denied:
+        return denied
+    return flask.send_from_directory(profiler.directory, name, mimetype="application/json",
+                                     as_attachment=True)
+
+
+def raw_pcm_too_large():
+    return jsonify({"error": f"Raw PCM is limited to {PCM_MAX_MB} MB; "
+                             f"send longer audio in an encoded format"}), 413
+
+
+@app.route("/v1/audio/transcriptions", methods=["POST"])
+@traced
+def transcribe_audio():
+    started = time.perf_counter()
+    with timed("upload"):
+        try:
+            pcm_format = requested_pcm_format()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if pcm_format is None:
+            upload, error = validate_upload()
+            if error:
+                return error
+            file, original_filename, ext = upload
+            cache_key = upload_digest(file.stream)
+        elif request.mimetype in PCM_MIMETYPES:
+            if (request.content_length or 0) > PCM_MAX_MB * 1024 * 1024:
+                return raw_pcm_too_large()
+            pcm_data = request.get_data()
+            if len(pcm_data) > PCM_MAX_MB * 1024 * 1024:
+                return raw_pcm_too_large()
+            original_filename = "raw PCM"
+            cache_key = upload_digest(io.BytesIO(pcm_data), pcm_format)
+        elif "file" not in request.files:
+            return jsonify({"error": "No file part in the request"}), 400
+        else:
+            pcm_data = request.files["file"].read(PCM_MAX_MB * 1024 * 1024 + 1)
+            if len(pcm_data) > PCM_MAX_MB * 1024 * 1024:
+                return raw_pcm_too_large()
+            original_filename = secure_filename(request.files["file"].filename) or "raw PCM"
+            cache_key = upload_digest(io.BytesIO(pcm_data), pcm_format)
+
+    # Raw PCM bodies carry no form, so options may also come in the query string.
+    response_format = request.values.get("response_format", "json")
+    if response_format not in RESPONSE_FORMATS:
+        response_format = "json"
+    word_timestamps = "word" in request.values.getlist("timestamp_granularities[]")
+
     unique_id = str(uuid.uuid4())
     temp_original_path = os.path.join(
         app.config["UPLOAD_FOLDER"], f"{unique_id}_{original_filename}"
     )
-    target_wav_path = os.path.join(app.config["UPLOAD_FOLDER"], f"{unique_id}.wav")
+    target_pcm_path = os.path.join(app.config["UPLOAD_FOLDER"], f"{unique_id}.pcm")
     temp_files_to_clean = []
 
+    requested_priority = request.values.get("priority")
+    if requested_priority not in PRIORITIES:
+        requested_priority = None
+    stream_mode = requested_stream_mode()
+
+    cached = cached_transcript(cache_key)
+    if cached is not None:
+        print(f"[{unique_id}] Serving cached transcript for '{original_filename}'.")
+        jobs.create(unique_id, "processing", total_chunks=1)
+        if stream_mode:
+            response = event_stream(stream_mode, stream_segments(
+                stream_mode, unique_id, [cached], cached.duration, 1, None), unique_id)
+            # A client that disconnects mid-replay skips jobs.complete.
+            response.call_on_close(lambda: jobs.fail(
+                unique_id, "Request ended before the transcription finished"))
+            return response
+        jobs.complete(unique_id)
+        with timed("render"):
+            return render_transcript(cached, response_format, unique_id, word_timestamps)
+
+    if not scheduler.workers:
+        return overloaded("Model is loading", 5)
+    if not admission.try_enter():
+        return overloaded("Server is at capacity", scheduler.estimate_wait())
+    admitted_class = None
+    windowed = None
+    streaming = False
+
+    def release():
+        jobs.fail(unique_id, "Request ended before the transcription finished")
+        admission.leave(admitted_class)
+        if windowed is not None:
+            windowed.decoder.close()
+        print(f"[{unique_id}] Cleaning up temporary files...")
+        for f_path in temp_files_to_clean:
+            if os.path.exists(f_path):
+                os.remove(f_path)
+
     try:
-        file.save(temp_original_path)
-        temp_files_to_clean.append(temp_original_path)
-
-        print(f"[{unique_id}] Converting '{original_filename}' to standard WAV format...")
-        ffmpeg_command = [
-            "ffmpeg", "-nostdin", "-y",
-            "-i", temp_original_path,
-            "-ac", "1", "-ar", "16000",
-            target_wav_path,
-        ]
-        result = subprocess.run(ffmpeg_command, capture_output=True, text=True)
-        if result.returncode != 0:
-            print(f"FFmpeg error: {result.stderr}")
+        with timed("decode"):
+            # Flask closes the upload when the view returns, while windowed
+            # audio is still being decoded for a streamed response, so
+            # streamed requests decode from a saved copy.
+            if pcm_format is not None:
+                print(f"[{unique_id}] Converting {original_filename} "
+                      f"({'/'.join(map(str, pcm_format))}) in-process...")
+                samples = pcm_samples(pcm_data, *pcm_format)
+            elif PIPE_DECODE and ext not in SEEKABLE_EXTENSIONS and not stream_mode:
+                print(f"[{unique_id}] Decoding '{original_filename}' to 16 kHz PCM...")
+                samples = load_audio(unique_id, file.stream, target_pcm_path,
+                                     temp_files_to_clean)
+            else:
+                file.save(temp_original_path)
+                temp_files_to_clean.append(temp_original_path)
+                samples = load_audio(unique_id, temp_original_path, target_pcm_path,
+                                     temp_files_to_clean)
+        if samples is None:
             return jsonify({"error": "File conversion failed"}), 500
-        temp_files_to_clean.append(target_wav_path)
 
-        CHUNK_DURATION_SECONDS = CHUNK_MINUTE * 60
-        total_duration = get_audio_duration(target_wav_path)
-        if total_duration == 0:
+        windowed = samples if isinstance(samples, WindowedAudio) else None
+        if windowed is None and len(samples) == 0:
             return jsonify({"error": "Cannot process audio with 0 duration"}), 400
-
-        chunk_paths = []
-        split_points = []
-
-        if total_duration > CHUNK_DURATION_SECONDS:
-            print(f"[{unique_id}] Detecting silence points for intelligent chunking...")
-            silence_points = detect_silence_points(target_wav_path, total_duration=total_duration)
-
-            if silence_points:
-                print(f"[{unique_id}] Found {len(silence_points)} silence periods")
-                split_points = find_optimal_split_points(
-                    total_duration, CHUNK_DURATION_SECONDS, silence_points,
-                    search_window=SILENCE_SEARCH_WINDOW
-                )
-                print(f"[{unique_id}] Optimal split points: {[f'{sp:.2f}s' for sp in split_points]}")
-            else:
-                print(f"[{unique_id}] No silence detected, using time-based chunking")
-
-        if split_points:
-            chunk_boundaries = [0.0] + split_points + [total_duration]
-            num_chunks = len(chunk_boundaries) - 1
+        if windowed is not None:
+            total_duration = num_chunks = None
         else:
-            num_chunks = math.ceil(total_duration / CHUNK_DURATION_SECONDS)
-            chunk_boundaries = [min(i * CHUNK_DURATION_SECONDS, total_duration)
-                                for i in range(num_chunks + 1)]
+            total_duration, chunk_boundaries = plan_chunks(unique_id, samples)
+            num_chunks = len(chunk_boundaries) - 1
 
-        progress_tracker[unique_id] = {
-            "status": "processing",
-            "current_chunk": 0,
-            "total_chunks": num_chunks,
-            "progress_percent": 0,
-            "partial_text": ""
-        }
+        priority = requested_priority or (
+            "interactive" if windowed is None and total_duration <= INTERACTIVE_MAX_SECONDS
+            else "bulk")
+        if not admission.try_classify(priority):
+            return overloaded(f"Too many {priority} transcriptions in progress",
+                              scheduler.estimate_wait(priority))
+        admitted_class = priority
+
+        if windowed is not None:
+            print(f"[{unique_id}] Longer than {WINDOWED_MIN_SECONDS:.0f}s, "
+                  f"transcribing window by window ({priority}).")
+            futures = []
+            chunk_segments = collect_windowed_segments(unique_id, windowed, priority)
+        else:
+            print(f"[{unique_id}] Total duration: {total_duration:.2f}s. "
+                  f"Splitting into {num_chunks} chunks ({priority}).")
+
+            with timed("chunking"):
+                chunk_inputs = slice_chunks(samples, chunk_boundaries)
+            chunk_inputs, timelines = gate_chunks(chunk_inputs)
+            futures = scheduler.submit_many(chunk_inputs, priority)
+            chunk_segments = collect_segments(unique_id, futures, chunk_boundaries, timelines)
+
+        jobs.create(unique_id, "processing", priority=priority, total_chunks=num_chunks)
+
+        if stream_mode:
+            response = event_stream(stream_mode, stream_segments(
+                stream_mode, unique_id, chunk_segments, total_duration,
+                num_chunks, priority, cache_key, started, windowed), unique_id)
+
+            def finish_stream():
+                # Drop chunks still queued if the client went away early.
+                for future in futures:
+                    future.cancel()
+                chunk_segments.close()
+                release()
+
+            response.call_on_close(finish_stream)
+            streaming = True
+            return response
 
-        print(f"[{unique_id}] Total duration: {total_duration:.2f}s. "
-              f"Splitting into {num_chunks} chunks.")
+        result = transcript_result(chunk_segments, total_duration)
+        if windowed is not None:
+            total_duration = result.duration = windowed.duration
+        print(f"[{unique_id}] All chunks transcribed, merging results.")
+        jobs.complete(unique_id)
+        transcripts.put(cache_key, result)
+
+        with timed("render"):
+            response = render_transcript(result, response_format, unique_id, word_timestamps)
+        record_transcription(started, total_duration)
+        return response
+
+    except QueueFull as e:
+        admission.reject(priority)
+        print(f"[{unique_id}] Rejected: {e}")
+        return overloaded(str(e), e.retry_after)
+    except Exception as e:
+        print(f"Error during processing: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": "Internal server error"}), 500
+    finally:
+        # A streamed response keeps its admission slot and decoded audio
+        # until the last event has been sent.
+        if not streaming:
+            release()
+
+
+job_queue = queue.Queue()
+
+
+def spool_job(job_id, upload_name, priority, submitted_at, cache_key):
+    """Record a queued job on disk, atomically, so a restart can resume it."""
+    manifest = {"filename": upload_name, "priority": priority,
+                "submitted_at": submitted_at, "cache_key": cache_key}
+    job_dir = os.path.join(JOB_SPOOL_DIR, job_id)
+    partial = os.path.join(job_dir, "job.json.tmp")
+    with open(partial, "w") as f:
+        json.dump(manifest, f)
+    os.replace(partial, os.path.join(job_dir, "job.json"))
+
+
+def restore_spooled_jobs():
+    """Requeue jobs that were queued or running when the server stopped."""
+    spooled = []
+    for job_id in os.listdir(JOB_SPOOL_DIR):
+        job_dir = os.path.join(JOB_SPOOL_DIR, job_id)
+        try:
+            with open(os.path.join(job_dir, "job.json")) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            # Interrupted mid-upload; the client never got a job id.
+            shutil.rmtree(job_dir, ignore_errors=True)
+            continue
+        spooled.append((manifest["submitted_at"], job_id, manifest))
+
+    for submitted_at, job_id, manifest in sorted(spooled):
+        jobs.create(job_id, "queued", priority=manifest["priority"],
+                    filename=manifest["filename"], cache_key=manifest.get("cache_key"),
+                    created_at=submitted_at)
+        job_queue.put(job_id)
+    if spooled:
+        print(f"Resuming {len(spooled)} spooled transcription job(s)")
+
+
+def submit_chunks(chunk_inputs, priority):
+    """Queue a background job's chunks, waiting out a full queue."""
+    while True:
+        try:
+            return scheduler.submit_many(chunk_inputs, priority)
+        except QueueFull as e:
+            time.sleep(e.retry_after)
+
+
+def transcribe_path(job_id, path, pcm_path, temp_files, priority):
+    """Transcribe a file on disk in the background, reporting progress to jobs.
+
+    Returns the Transcript; raises if the file cannot be decoded.
+    """
+    with timed("decode"):
+        samples = load_audio(job_id, path, pcm_path, temp_files)
+    if samples is None:
+        raise RuntimeError("File conversion failed")
+    if isinstance(samples, WindowedAudio):
+        print(f"[{job_id}] Longer than {WINDOWED_MIN_SECONDS:.0f}s, "
+              f"transcribing window by window ({priority}).")
+        jobs.start(job_id, total_chunks=None)
+        result = transcript_result(collect_windowed_segments(job_id, samples, priority), None)
+        result.duration = samples.duration
+        return result
+    if len(samples) == 0:
+        raise ValueError("Cannot process audio with 0 duration")
+    total_duration, chunk_boundaries = plan_chunks(job_id, samples)
+    num_chunks = len(chunk_boundaries) - 1
+    print(f"[{job_id}] Total duration: {total_duration:.2f}s. "
+          f"Splitting into {num_chunks} chunks ({priority}).")
+
+    with timed("chunking"):
+        chunk_inputs = slice_chunks(samples, chunk_boundaries)
+    chunk_inputs, timelines = gate_chunks(chunk_inputs)
+    futures = submit_chunks(chunk_inputs, priority)
+    jobs.start(job_id, total_chunks=num_chunks)
+    return transcript_result(
+        collect_segments(job_id, futures, chunk_boundaries, timelines), total_duration)
+
+
+def run_job(job_id):
+    job = jobs.get(job_id)
+    job_dir = os.path.join(JOB_SPOOL_DIR, job_id)
+    temp_files = []
+    jobs.start(job_id)
+    started = time.perf_counter()
+    try:
+        result = transcribe_path(job_id, os.path.join(job_dir, job["filename"]),
+                                 os.path.join(job_dir, "audio.pcm"), temp_files, job["priority"])
+        jobs.complete(job_id, result)
+        record_transcription(started, result.duration)
+        if job["cache_key"]:
+            transcripts.put(job["cache_key"], result)
+        print(f"[{job_id}] Job complete.")
+    except Exception as e:
+        print(f"[{job_id}] Job failed: {e}")
+        jobs.fail(job_id, str(e))
+    finally:
+        shutil.rmtree(job_dir, ignore_errors=True)
 
-        if num_chunks > 1:
-            for i in range(num_chunks):
-                start_time = chunk_boundaries[i]
-                duration = chunk_boundaries[i + 1] - start_time
-                chunk_path = os.path.join(
-                    app.config["UPLOAD_FOLDER"], f"{unique_id}_chunk_{i}.wav"
-                )
-                chunk_paths.append(chunk_path)
-                temp_files_to_clean.append(chunk_path)
-
-                chunk_command = [
-                    "ffmpeg", "-nostdin", "-y",
-                    "-ss", str(start_time),
-                    "-t", str(duration),
-                    "-i", target_wav_path,
-                    "-ac", "1", "-ar", "16000", "-c:a", "pcm_s16le",
-                    chunk_path,
-                ]
-                result = subprocess.run(chunk_command, capture_output=True, text=True)
-                if result.returncode != 0:
-                    print(f"Warning: Chunk extraction failed: {result.stderr}")
-        else:
-            chunk_paths.append(target_wav_path)
 
-        all_segments = []
-        all_words = []
-        cumulative_time_offset = 0.0
+def job_worker():
+    while True:
+        run_job(job_queue.get())
 
-        chunk_durations = []
-        if num_chunks > 1:
-            for i in range(num_chunks):
-                chunk_durations.append(chunk_boundaries[i + 1] - chunk_boundaries[i])
-        else:
-            chunk_durations.append(total_duration)
-
-        def clean_text(text):
-            if not text:
-                return ""
-            text = text.replace("\u2581", " ").strip()
-            text = re.sub(r"\s+", " ", text)
-            text = text.replace(" '", "'")
-            return text
-
-        for i, chunk_path in enumerate(chunk_paths):
-            progress_tracker[unique_id].update({
-                "current_chunk": i + 1,
-                "progress_percent": int((i + 1) / num_chunks * 100)
-            })
-            print(f"[{unique_id}] Transcribing chunk {i + 1}/{num_chunks}...")
 
-            result = asr_model.recognize(chunk_path)
+def job_accepted(job_id, status):
+    response = jsonify({"id": job_id, "status": status})
+    response.status_code = 202
+    response.headers["Location"] = f"/v1/audio/transcriptions/jobs/{job_id}"
+    response.headers["X-Job-ID"] = job_id
+    return response
 
-            if result and result.text:
-                start_time = result.timestamps[0] if result.timestamps else 0
-                end_time = (result.timestamps[-1]
-                            if len(result.timestamps) > 1
-                            else start_time + 0.1)
 
-                cleaned_text = clean_text(result.text)
+def enqueue_upload(file, original_filename, ext, priority):
+    """Spool an upload as a background job and return its id and status.
 
-                segment = {
-                    "start": start_time + cumulative_time_offset,
-                    "end": end_time + cumulative_time_offset,
-                    "segment": cleaned_text,
-                }
-                all_segments.append(segment)
+    A cached transcript completes the job at once. Raises OSError if the
+    upload cannot be spooled.
+    """
+    job_id = str(uuid.uuid4())
+    cache_key = upload_digest(file.stream)
+    cached = cached_transcript(cache_key)
+    if cached is not None:
+        print(f"[{job_id}] Serving cached transcript for '{original_filename}'.")
+        jobs.create(job_id, "processing", priority=priority, total_chunks=1)
+        jobs.complete(job_id, cached)
+        return job_id, "complete"
 
-                progress_tracker[unique_id]["partial_text"] += cleaned_text + " "
+    job_dir = os.path.join(JOB_SPOOL_DIR, job_id)
+    try:
+        os.makedirs(job_dir)
+        upload_name = f"upload{ext}"
+        file.save(os.path.join(job_dir, upload_name))
+        submitted_at = time.time()
+        spool_job(job_id, upload_name, priority, submitted_at, cache_key)
+    except OSError as e:
+        print(f"[{job_id}] Could not spool upload: {e}")
+        shutil.rmtree(job_dir, ignore_errors=True)
+        raise
+
+    jobs.create(job_id, "queued", priority=priority, filename=upload_name,
+                cache_key=cache_key, created_at=submitted_at)
+    job_queue.put(job_id)
+    print(f"[{job_id}] Queued '{original_filename}' ({priority}).")
+    return job_id, "queued"
+
+
+@app.route("/v1/audio/transcriptions/jobs", methods=["POST"])
+def submit_job():
+    upload, error = validate_upload()
+    if error:
+        return error
+    file, original_filename, ext = upload
+
+    priority = request.form.get("priority")
+    if priority not in PRIORITIES:
+        priority = "bulk"
+    if jobs.count("queued") >= MAX_QUEUED_JOBS:
+        return overloaded("Job queue is full", scheduler.estimate_wait(priority))
 
-                for j, (token, timestamp) in enumerate(
-                    zip(result.tokens, result.timestamps)
-                ):
-                    word_end = (result.timestamps[j + 1]
-                                if j < len(result.timestamps) - 1
-                                else end_time)
-                    clean_token = token.replace("\u2581", " ").strip()
-                    all_words.append({
-                        "start": timestamp + cumulative_time_offset,
-                        "end": word_end + cumulative_time_offset,
-                        "word": clean_token,
-                    })
+    try:
+        job_id, status = enqueue_upload(file, original_filename, ext, priority)
+    except OSError:
+        return jsonify({"error": "Internal server error"}), 500
+    return job_accepted(job_id, status)
 
-            cumulative_time_offset += chunk_durations[i]
 
-        print(f"[{unique_id}] All chunks transcribed, merging results.")
+@app.route("/v1/audio/transcriptions/bulk", methods=["POST"])
+def submit_bulk():
+    """Queue every ``file`` part of the request as its own background job.
 
-        progress_tracker[unique_id]["status"] = "complete"
-        progress_tracker[unique_id]["progress_percent"] = 100
-        progress_tracker[unique_id]["completed_at"] = time.time()
-
-        full_text = " ".join([seg["segment"] for seg in all_segments])
-
-        if response_format == "srt":
-            return Response(segments_to_srt(all_segments), mimetype="text/plain")
-        elif response_format == "vtt":
-            return Response(segments_to_vtt(all_segments), mimetype="text/plain")
-        elif response_format == "text":
-            return Response(full_text, mimetype="text/plain")
-        elif response_format == "verbose_json":
-            return jsonify({
-                "task": "transcribe",
-                "language": "english",
-                "duration": total_duration,
-                "text": full_text,
-                "segments": [
-                    {
-                        "id": idx,
-                        "seek": 0,
-                        "start": seg["start"],
-                        "end": seg["end"],
-                        "text": seg["segment"],
-                        "tokens": [],
-                        "temperature": 0.0,
-                        "avg_logprob": 0.0,
-                        "compression_ratio": 0.0,
-                        "no_speech_prob": 0.0,
-                    }
-                    for idx, seg in enumerate(all_segments)
-                ],
-            })
+    The files are checked before any is spooled, so a bad one rejects the
+    whole request. Each job is then polled like a single submitted job.
+    """
+    files = request.files.getlist("file")
+    if not files:
+        return jsonify({"error": "No file part in the request"}), 400
+    if len(files) > MAX_BULK_FILES:
+        return jsonify({"error": f"At most {MAX_BULK_FILES} files per request"}), 413
+    uploads = []
+    for file in files:
+        upload, error = validate_upload(file)
+        if error:
+            return error
+        uploads.append(upload)
+
+    priority = request.form.get("priority")
+    if priority not in PRIORITIES:
+        priority = "bulk"
+    if jobs.count("queued") + len(uploads) > MAX_QUEUED_JOBS:
+        return overloaded("Job queue is full", scheduler.estimate_wait(priority))
+
+    accepted = []
+    for file, original_filename, ext in uploads:
+        try:
+            job_id, status = enqueue_upload(file, original_filename, ext, priority)
+        except OSError:
+            accepted.append({"filename": original_filename, "status": "failed",
+                             "error": "Internal server error"})
+            continue
+        accepted.append({"filename": original_filename, "id": job_id, "status": status,
+                         "location": f"/v1/audio/transcriptions/jobs/{job_id}"})
+    response = jsonify({"jobs": accepted})
+    response.status_code = 202
+    return response
+
+
+@app.route("/v1/audio/transcriptions/jobs/<job_id>")
+def get_job(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    job.pop("filename", None)
+    job.pop("cache_key", None)
+    return jsonify({"id": job_id, **job})
+
+
+@app.route("/v1/audio/transcriptions/jobs/<job_id>/result")
+def get_job_result(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if job["status"] == "failed":
+        return jsonify({"error": job["error"]}), 500
+    if job["status"] != "complete":
+        return jsonify({"error": "Job is not complete", "status": job["status"]}), 409
+    result = jobs.result(job_id)
+    if result is None:
+        return jsonify({"error": "Result has expired"}), 410
+
+    response_format = request.args.get("response_format", "json")
+    if response_format not in RESPONSE_FORMATS:
+        response_format = "json"
+    word_timestamps = "word" in request.args.getlist("timestamp_granularities[]")
+    with timed("render"):
+        return render_transcript(result, response_format, job_id, word_timestamps)
+
+
+JOB_SPOOL_DIR = os.environ.get("PARAKEET_JOB_DIR", JOB_SPOOL_DIR)
+os.makedirs(JOB_SPOOL_DIR, exist_ok=True)
+# The bulk CLI may share the server's spool directory; it must not take over
+# the server's jobs.
+if not BULK_CLI:
+    restore_spooled_jobs()
+for i in range(env_int("PARAKEET_JOB_WORKERS", JOB_WORKERS)):
+    threading.Thread(target=job_worker, daemon=True, name=f"job-worker-{i}").start()
+
+
+def bulk_inputs(target):
+    """Yield the audio files under a directory, or listed in a manifest.
+
+    A manifest names one file per line, relative to the manifest; blank
+    lines and lines starting with # are skipped.
+    """
+    if os.path.isdir(target):
+        for root, dirs, files in os.walk(target):
+            dirs.sort()
+            for name in sorted(files):
+                if os.path.splitext(name)[1].lower() in ALLOWED_EXTENSIONS:
+                    yield os.path.join(root, name)
+        return
+    base = os.path.dirname(target)
+    with open(target) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield os.path.join(base, line)
+
+
+def bulk_outputs(path, formats):
+    """Output paths for an input: its full file name plus each format's
+    extension, so talk.wav and talk.mp3 in one directory do not collide."""
+    return {fmt: f"{path}.{fmt}" for fmt in formats}
+
+
+def write_output(path, data):
+    """Write a transcript atomically, so a partial file never looks complete."""
+    partial = f"{path}.tmp"
+    with open(partial, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(partial, path)
+
+
+def transcribe_to_files(path, formats):
+    """Transcribe one input at bulk priority and write its outputs beside it.
+
+    Returns "skipped" if every output already exists, "cached" or
+    "transcribed" otherwise; raises if the input cannot be transcribed.
+    """
+    outputs = bulk_outputs(path, formats)
+    if all(os.path.exists(output) for output in outputs.values()):
+        return "skipped"
+    job_id = str(uuid.uuid4())
+    with open(path, "rb") as f:
+        cache_key = upload_digest(f)
+    result = transcripts.get(cache_key)
+    status = "cached"
+    if result is None:
+        status = "transcribed"
+        jobs.create(job_id, "queued", priority="bulk", filename=os.path.basename(path))
+        temp_files = []
+        started = time.perf_counter()
+        jobs.start(job_id)
+        try:
+            result = transcribe_path(
+                job_id, path, os.path.join(app.config["UPLOAD_FOLDER"], f"{job_id}.pcm"),
+                temp_files, "bulk")
+        except Exception as e:
+            jobs.fail(job_id, str(e))
+            raise
+        finally:
+            for temp_file in temp_files:
+                with contextlib.suppress(OSError):
+                    os.remove(temp_file)
+        jobs.complete(job_id)
+        record_transcription(started, result.duration)
+        transcripts.put(cache_key, result)
+    with timed("render"):
+        for fmt, output in outputs.items():
+            body = transcript_body(result, BULK_FORMATS[fmt], word_timestamps=True)
+            if not isinstance(body, str):
+                body = json.dumps(body, ensure_ascii=False)
+            write_output(output, body)
+    return status
+
+
+def run_bulk(paths, formats, concurrency):
+    """Transcribe ``paths`` with up to ``concurrency`` files in flight.
+
+    Yields ``(path, status, error)`` as each file finishes. Files in flight
+    share the batch scheduler, so short files fill batches together.
+    """
+    with concurrent.futures.ThreadPoolExecutor(concurrency, thread_name_prefix="bulk") as pool:
+        futures = {pool.submit(transcribe_to_files, path, formats): path for path in paths}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], "failed", str(e)
+
+
+def bulk_main(argv):
+    parser = argparse.ArgumentParser(
+        prog="app.py bulk",
+        description="Transcribe a directory or manifest of audio files, writing the "
+                    "transcripts next to each input. Inputs whose outputs all exist "
+                    "are skipped, so an interrupted run can simply be restarted.")
+    parser.add_argument("target", help="directory to scan, or a manifest listing one file per line")
+    parser.add_argument("--formats", default=",".join(BULK_FORMATS),
+                        help="comma-separated output formats (default: %(default)s)")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="files in flight at once (default: PARAKEET_BULK_FILES)")
+    args = parser.parse_args(argv)
+    formats = [fmt for fmt in args.formats.split(",") if fmt]
+    unknown = sorted(set(formats) - set(BULK_FORMATS))
+    if unknown or not formats:
+        parser.error(f"unsupported format(s): {', '.join(unknown) or 'none given'}; "
+                     f"choose from {', '.join(BULK_FORMATS)}")
+    # A manifest may name a file twice; two writers would share its outputs.
+    paths = list(dict.fromkeys(os.path.normpath(path) for path in bulk_inputs(args.target)))
+
+    while startup["ready_seconds"] is None:
+        time.sleep(0.5)
+    concurrency = args.concurrency or env_int(
+        "PARAKEET_BULK_FILES", BULK_FILES or max(2, scheduler.max_batch))
+    print(f"Bulk: {len(paths)} file(s), {concurrency} in flight, formats {','.join(formats)}")
+    counts = collections.Counter()
+    for done, (path, status, error) in enumerate(run_bulk(paths, formats, concurrency), 1):
+        counts[status] += 1
+        print(f"[{done}/{len(paths)}] {status}: {path}" + (f" ({error})" if error else ""))
+    print("Bulk done: " + ", ".join(f"{count} {status}" for status, count in sorted(counts.items())))
+    return 1 if counts["failed"] else 0
+
+
+class StreamDecoder:
+    """Long-running ffmpeg process that decodes audio as it is written."""
+
+    def __init__(self, input_args):
+        self.proc = subprocess.Popen(
+            ["ffmpeg", "-hide_banner", "-loglevel", "error",
+             "-fflags", "+nobuffer", "-probesize", "4096", "-analyzeduration", "0",
+             *input_args, "-i", "pipe:0",
+             "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "f32le", "pipe:1"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+        self._lock = threading.Lock()
+        self._pcm = bytearray()
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def _read(self):
+        while True:
+            data = self.proc.stdout.read1(PIPE_BUFFER_SIZE)
+            if not data:
+                return
+            with self._lock:
+                self._pcm += data
+
+    def write(self, data):
+        try:
+            self.proc.stdin.write(data)
+            self.proc.stdin.flush()
+        except OSError:
+            pass  # ffmpeg gave up on the input; close() returns what it decoded
+
+    def read(self):
+        with self._lock:
+            usable = len(self._pcm) - len(self._pcm) % 4
+            data = bytes(self._pcm[:usable])
+            del self._pcm[:usable]
+        return np.frombuffer(data, dtype=np.float32)
+
+    def close(self):
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+        self._reader.join(timeout=1)
+        return self.read()
+
+
+class StreamingTranscriber:
+    """Incremental transcription of one live stream with stable-prefix commit.
+
+    Audio accumulates in a window that starts at the end of the last
+    committed word. Every STREAM_STEP_SECONDS of new audio the window is
+    re-recognized; the token prefix two consecutive hypotheses agree on is
+    committed up to its last complete word and the window is trimmed there,
+    so each pass only covers the still-uncertain tail.
+    """
+
+    def __init__(self, fmt, sample_rate):
+        self.decoder = None
+        self.dtype = None
+        if fmt.startswith("pcm_") and sample_rate == SAMPLE_RATE:
+            self.dtype = np.int16 if fmt == "pcm_s16le" else np.float32
+            self._remainder = b""
         else:
-            response = jsonify({"text": full_text})
-            response.headers['X-Job-ID'] = unique_id
-            return response
-
+            input_args = list(STREAM_FORMATS[fmt])
+            if fmt.startswith("pcm_"):
+                input_args += ["-ar", str(sample_rate), "-ac", "1"]
+            self.decoder = StreamDecoder(input_args)
+        self.window = np.zeros(0, dtype=np.float32)
+        self.window_start = 0.0
+        self.total_samples = 0
+        self.since_step = 0
+        self.tokens = []
+        self.timestamps = []
+        self.previous = []
+
+    def _decode(self, data):
+        if self.decoder is not None:
+            self.decoder.write(data)
+            return self.decoder.read()
+        data = self._remainder + data
+        itemsize = np.dtype(self.dtype).itemsize
+        usable = len(data) - len(data) % itemsize
+        self._remainder = data[usable:]
+        samples = np.frombuffer(data[:usable], dtype=self.dtype)
+        if self.dtype == np.int16:
+            return samples.astype(np.float32) / 32768.0
+        return samples
+
+    def _append(self, samples):
+        if len(samples):
+            self.window = np.concatenate((self.window, samples))
+            self.total_samples += len(samples)
+            self.since_step += len(samples)
+
+    def feed(self, data):
+        """Add a frame of audio; returns a partial update when a step ran."""
+        self._append(self._decode(data))
+        if self.since_step < STREAM_STEP_SECONDS * SAMPLE_RATE:
+            return None
+        return self._step(final=False)
+
+    def finish(self):
+        if self.decoder is not None:
+            self._append(self.decoder.close())
+            self.decoder = None
+        return self._step(final=True)
+
+    def close(self):
+        if self.decoder is not None:
+            self.decoder.close()
+            self.decoder = None
+
+    @staticmethod
+    def _word_cut(tokens, limit):
+        """Index of the last word start at or before ``limit`` (0 if none)."""
+        for j in range(min(limit, len(tokens) - 1), 0, -1):
+            if tokens[j].startswith("▁"):
+                return j
+        return 0
+
+    def _commit(self, tokens, timestamps, count):
+        self.tokens.extend(tokens[:count])
+        self.timestamps.extend(t + self.window_start for t in timestamps[:count])
+
+    def _step(self, final):
+        self.since_step = 0
+        tokens, timestamps = [], []
+        if len(self.window) >= STREAM_MIN_SAMPLES:
+            result = scheduler.submit(self.window, "interactive").result()
+            tokens, timestamps = list(result.tokens), list(result.timestamps)
+
+        if final:
+            self._commit(tokens, timestamps, len(tokens))
+            end = self.total_samples / SAMPLE_RATE
+            words = [
+                {"start": start,
+                 "end": self.timestamps[j + 1] if j + 1 < len(self.timestamps) else end,
+                 "word": token.replace("▁", " ").strip()}
+                for j, (token, start) in enumerate(zip(self.tokens, self.timestamps))
+            ]
+            return {"type": "final", "text": clean_text("".join(self.tokens)),
+                    "duration": end, "words": words}
+
+        agreed = 0
+        while (agreed < min(len(tokens), len(self.previous))
+               and tokens[agreed] == self.previous[agreed]):
+            agreed += 1
+        max_window = STREAM_MAX_WINDOW_SECONDS * SAMPLE_RATE
+        over = len(self.window) >= max_window
+        if over:
+            agreed = len(tokens)  # window too long; keep all but the open word
+        cut = self._word_cut(tokens, agreed)
+        if over and not cut:
+            # Silence or a single open word: keep only the last token.
+            cut = max(len(tokens) - 1, 0)
+        if cut > 0 or over:
+            drop = round(timestamps[cut] * SAMPLE_RATE) if tokens else len(self.window)
+            if len(self.window) - drop >= max_window:
+                cut, drop = len(tokens), len(self.window)
+            self._commit(tokens, timestamps, cut)
+            drop = min(drop, len(self.window))
+            self.window = self.window[drop:]
+            self.window_start += drop / SAMPLE_RATE
+            tokens = tokens[cut:]
+        self.previous = tokens
+
+        committed = clean_text("".join(self.tokens))
+        tentative = clean_text("".join(tokens))
+        return {"type": "partial", "text": f"{committed} {tentative}".strip(),
+                "committed": committed, "tentative": tentative,
+                "audio_seconds": self.total_samples / SAMPLE_RATE}
+
+
+stream_sessions = threading.BoundedSemaphore(STREAM_MAX_SESSIONS)
+
+
+def handle_stream(websocket):
+    """WebSocket handler: binary frames in, JSON partial/final updates out.
+
+    Query parameters select ``format`` (see STREAM_FORMATS) and, for raw PCM,
+    ``sample_rate``. Send {"type": "end"} when capture stops to get the final
+    transcript; closing without it still flushes and transcribes the tail.
+    """
+    from websockets.exceptions import ConnectionClosed
+
+    url = urllib.parse.urlsplit(websocket.request.path)
+    if url.path != STREAM_PATH:
+        websocket.close(1008, "Unknown path")
+        return
+    params = urllib.parse.parse_qs(url.query)
+    fmt = params.get("format", ["pcm_s16le"])[0]
+    try:
+        sample_rate = int(params.get("sample_rate", [SAMPLE_RATE])[0])
+    except ValueError:
+        sample_rate = 0
+    if fmt not in STREAM_FORMATS or sample_rate <= 0:
+        websocket.close(1003, "Unsupported format or sample_rate")
+        return
+    if not scheduler.workers:
+        websocket.close(1013, "Model is loading")
+        return
+    if not stream_sessions.acquire(blocking=False):
+        websocket.close(1013, "Too many concurrent streams")
+        return
+
+    session = None
+    try:
+        session = StreamingTranscriber(fmt, sample_rate)
+        for message in websocket:
+            if isinstance(message, str):
+                try:
+                    if json.loads(message).get("type") == "end":
+                        break
+                except (ValueError, AttributeError):
+                    pass
+                continue
+            update = session.feed(message)
+            if update:
+                websocket.send(json.dumps(update))
+        final = session.finish()
+        print(f"[stream] Finished {final['duration']:.1f}s of audio")
+        websocket.send(json.dumps(final))
+        websocket.close()
+    except ConnectionClosed:
+        pass
     except Exception as e:
-        print(f"Error during processing: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({"error": "Internal server error"}), 500
+        print(f"[stream] Error: {e}")
+        try:
+            websocket.send(json.dumps({"type": "error", "error": "Internal server error"}))
+        except ConnectionClosed:
+            pass
     finally:
-        print(f"[{unique_id}] Cleaning up temporary files...")
-        for f_path in temp_files_to_clean:
-            if os.path.exists(f_path):
-                os.remove(f_path)
+        if session is not None:
+            session.close()
+        stream_sessions.release()
+
+
+def serve_streaming():
+    try:
+        from websockets.sync.server import serve as serve_websocket
+    except ImportError:
+        print("websockets is not installed; streaming endpoint disabled")
+        return
+    with serve_websocket(handle_stream, host, STREAM_PORT) as server:
+        print(f"Streaming: ws://{host}:{STREAM_PORT}{STREAM_PATH}")
+        server.serve_forever()
 
 
 if __name__ == "__main__":
+    if BULK_CLI:
+        sys.exit(bulk_main(sys.argv[2:]))
     print(f"Starting server on {host}:{port} with {threads} threads...")
     print(f"API: POST http://{host}:{port}/v1/audio/transcriptions")
+    threading.Thread(target=serve_streaming, daemon=True, name="streaming").start()
     serve(app, host=host, port=port, threads=threads)
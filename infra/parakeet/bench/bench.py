@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""Throughput and latency benchmark for the Parakeet STT server.
+
+Generates a deterministic synthetic corpus, replays it against a running
+server at a fixed concurrency, and writes a JSON report that can be diffed
+against a saved baseline:
+
+    python bench.py --url http://localhost:27245 --output baseline.json
+    python bench.py --url http://localhost:27245 --baseline baseline.json
+
+Scenarios:
+- short: mic-style WebM/Opus clips of 2-8 s, the voice input path.
+- long: long WAVs, one continuous and one with pauses, so both time-based
+  and silence-aware chunking are exercised. At the default 15 minutes they
+  also run past the server's 10-minute threshold for windowed decoding.
+- mixed: short clips submitted while the long files are in flight, to show
+  what bulk work costs interactive latency.
+
+The corpus is made of syllable-like harmonic bursts, not speech, so the
+transcripts are meaningless. Decode, chunking and encoder cost still scale
+with duration the way real audio does. The same seed and durations give
+byte-identical WAVs, and the corpus digest in the report flags comparisons
+across different corpora. Opus output is bit-exact for a given ffmpeg build.
+
+Per-stage timings, peak RSS and cache hits come from scraping the server's
+/metrics before, during and after each scenario, so run the benchmark
+against an otherwise idle server. Requests send Cache-Control: no-cache so
+the transcript cache does not short-circuit repeated uploads.
+
+Requires numpy, and ffmpeg on PATH for the WebM/Opus clips.
+"""
+
+import argparse
+import concurrent.futures
+import datetime
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+import wave
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+OPUS_RATE = 48000
+NOISE_FLOOR = 10 ** (-60 / 20)
+REPORT_VERSION = 1
+
+# Metrics compared against a baseline, and whether larger values are better.
+COMPARED_METRICS = {
+    "latency_ms.p50": False,
+    "latency_ms.p95": False,
+    "latency_ms.p99": False,
+    "rtf.p50": False,
+    "rtf.p95": False,
+    "throughput_audio_x": True,
+    "throughput_rps": True,
+    "peak_rss_mb": False,
+}
+
+METRIC_LINE = re.compile(r'^(\w+)(?:\{([^}]*)\})? (\S+)$')
+
+
+def synthesize(rng, duration, pauses):
+    """Syllable-like harmonic bursts over a -60 dBFS noise floor.
+
+    With ``pauses`` a 0.8-1.5 s gap is inserted every 15-40 s, which is
+    long enough for the server's silence detection to split on.
+    """
+    total = int(duration * SAMPLE_RATE)
+    audio = rng.normal(0.0, NOISE_FLOOR / 3, total).astype(np.float32)
+    next_pause = rng.uniform(15.0, 40.0)
+    t = 0.0
+    while t < duration:
+        if pauses and t >= next_pause:
+            t += rng.uniform(0.8, 1.5)
+            next_pause = t + rng.uniform(15.0, 40.0)
+            continue
+        length = rng.uniform(0.12, 0.3)
+        start = int(t * SAMPLE_RATE)
+        n = min(int(length * SAMPLE_RATE), total - start)
+        if n <= 0:
+            break
+        time_axis = np.arange(n) / SAMPLE_RATE
+        f0 = rng.uniform(100.0, 220.0)
+        burst = np.zeros(n)
+        for harmonic, weight in enumerate(rng.dirichlet(np.ones(6)), start=1):
+            burst += weight * np.sin(2 * np.pi * f0 * harmonic * time_axis)
+        audio[start:start + n] += (0.3 * np.hanning(n) * burst).astype(np.float32)
+        t += length + rng.uniform(0.02, 0.06)
+    return np.clip(audio, -1.0, 1.0)
+
+
+def write_wav(path, audio):
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes((audio * 32767).astype("<i2").tobytes())
+
+
+def encode_webm(wav_path, webm_path):
+    """Encode like a browser MediaRecorder: 48 kHz mono Opus in WebM."""
+    subprocess.run(
+        ["ffmpeg", "-nostdin", "-y", "-loglevel", "error", "-i", wav_path,
+         "-ar", str(OPUS_RATE), "-ac", "1", "-c:a", "libopus", "-b:a", "32k",
+         "-fflags", "+bitexact", "-flags:a", "+bitexact", webm_path],
+        check=True,
+    )
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_corpus(directory, seed, short_clips, long_seconds):
+    """Generate the corpus, or reuse it if the manifest matches the spec."""
+    spec = {"seed": seed, "short_clips": short_clips, "long_seconds": long_seconds}
+    manifest_path = os.path.join(directory, "manifest.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest["spec"] == spec and all(
+            os.path.exists(os.path.join(directory, name)) for name in manifest["files"]
+        ):
+            return manifest
+
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    files = {}
+
+    for i in range(short_clips):
+        duration = round(float(rng.uniform(2.0, 8.0)), 2)
+        wav_path = os.path.join(directory, f"short-{i:03d}.wav")
+        name = f"short-{i:03d}.webm"
+        write_wav(wav_path, synthesize(rng, duration, pauses=False))
+        encode_webm(wav_path, os.path.join(directory, name))
+        os.remove(wav_path)
+        files[name] = {"kind": "short", "duration": duration}
+
+    for name, pauses in (("long-continuous.wav", False), ("long-pauses.wav", True)):
+        write_wav(os.path.join(directory, name), synthesize(rng, long_seconds, pauses))
+        files[name] = {"kind": "long", "duration": float(long_seconds)}
+
+    for name, entry in files.items():
+        entry["sha256"] = sha256_file(os.path.join(directory, name))
+    digest = hashlib.sha256(
+        "".join(files[name]["sha256"] for name in sorted(files)).encode()
+    ).hexdigest()
+
+    manifest = {"spec": spec, "digest": digest, "files": files}
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def multipart(fields, filename, payload):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for key, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n{value}\r\n'.encode()
+        )
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f"Content-Type: application/octet-stream\r\n\r\n".encode()
+    )
+    parts.append(payload)
+    parts.append(f"\r\n--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def transcribe(url, path, timeout):
+    with open(path, "rb") as f:
+        payload = f.read()
+    body, content_type = multipart({"response_format": "json"}, os.path.basename(path), payload)
+    req = urllib.request.Request(
+        f"{url}/v1/audio/transcriptions",
+        data=body,
+        headers={"Content-Type": content_type, "Cache-Control": "no-cache"},
+    )
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        status = None
+    return status, time.perf_counter() - started
+
+
+def scrape(url):
+    """Parse the server's Prometheus metrics into {(name, labels): value}."""
+    with urllib.request.urlopen(f"{url}/metrics", timeout=10) as resp:
+        text = resp.read().decode()
+    samples = {}
+    for line in text.splitlines():
+        match = METRIC_LINE.match(line)
+        if match:
+            name, labels, value = match.groups()
+            samples[(name, labels or "")] = float(value)
+    return samples
+
+
+class RssSampler:
+    """Polls process_resident_memory_bytes while a scenario runs."""
+
+    def __init__(self, url, interval):
+        self.url = url
+        self.interval = interval
+        self.peak = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                rss = scrape(self.url).get(("process_resident_memory_bytes", ""), 0.0)
+                self.peak = max(self.peak, rss)
+            except (urllib.error.URLError, OSError):
+                pass
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def summarize(values, scale=1.0):
+    if not values:
+        return {}
+    array = np.asarray(values) * scale
+    return {
+        "p50": round(float(np.percentile(array, 50)), 4),
+        "p95": round(float(np.percentile(array, 95)), 4),
+        "p99": round(float(np.percentile(array, 99)), 4),
+        "mean": round(float(array.mean()), 4),
+        "max": round(float(array.max()), 4),
+    }
+
+
+def stage_breakdown(before, after):
+    stages = {}
+    for (name, labels), total in after.items():
+        if name != "parakeet_stage_duration_seconds_sum":
+            continue
+        stage = labels.split('"')[1]
+        count = after[("parakeet_stage_duration_seconds_count", labels)] - before.get(
+            ("parakeet_stage_duration_seconds_count", labels), 0.0)
+        seconds = total - before.get((name, labels), 0.0)
+        if count:
+            stages[stage] = {
+                "count": int(count),
+                "total_s": round(seconds, 4),
+                "mean_ms": round(seconds / count * 1000, 3),
+            }
+    return stages
+
+
+def metric_delta(before, after, name):
+    return sum(value - before.get(key, 0.0) for key, value in after.items() if key[0] == name)
+
+
+def run_scenario(url, tasks, concurrency, timeout, rss_interval):
+    """Run ``(kind, path, duration)`` tasks and aggregate their results."""
+    before = scrape(url)
+    results = []
+    with RssSampler(url, rss_interval) as rss, \
+            concurrent.futures.ThreadPoolExecutor(concurrency) as pool:
+        started = time.perf_counter()
+        futures = [(kind, duration, pool.submit(transcribe, url, path, timeout))
+                   for kind, path, duration in tasks]
+        for kind, duration, future in futures:
+            status, latency = future.result()
+            results.append((kind, duration, status, latency))
+        wall = time.perf_counter() - started
+    after = scrape(url)
+
+    ok = [(kind, duration, latency) for kind, duration, status, latency in results
+          if status == 200]
+    audio_seconds = sum(duration for _, duration, _ in ok)
+    report = {
+        "concurrency": concurrency,
+        "requests": len(results),
+        "errors": len(results) - len(ok),
+        "status_counts": {str(status): sum(1 for r in results if r[2] == status)
+                          for status in sorted({r[2] for r in results}, key=str)},
+        "wall_seconds": round(wall, 3),
+        "audio_seconds": round(audio_seconds, 2),
+        "throughput_rps": round(len(ok) / wall, 3),
+        "throughput_audio_x": round(audio_seconds / wall, 2),
+        "latency_ms": summarize([latency for _, _, latency in ok], 1000),
+        "rtf": summarize([latency / duration for _, duration, latency in ok]),
+        "peak_rss_mb": round(rss.peak / (1024 ** 2), 1),
+        "stages": stage_breakdown(before, after),
+        "cache_hits": int(metric_delta(before, after, "parakeet_cache_hits_total")),
+    }
+    kinds = sorted({kind for kind, _, _ in ok})
+    if len(kinds) > 1:
+        report["by_kind"] = {
+            kind: {
+                "requests": sum(1 for k, _, _ in ok if k == kind),
+                "latency_ms": summarize([lat for k, _, lat in ok if k == kind], 1000),
+                "rtf": summarize([lat / d for k, d, lat in ok if k == kind]),
+            }
+            for kind in kinds
+        }
+    return report
+
+
+def scenario_tasks(name, manifest, corpus, short_requests, long_repeats):
+    def files(kind):
+        return [(kind, os.path.join(corpus, file), entry["duration"])
+                for file, entry in sorted(manifest["files"].items()) if entry["kind"] == kind]
+
+    short = files("short")
+    shorts = [short[i % len(short)] for i in range(short_requests)]
+    longs = files("long") * long_repeats
+    if name == "short":
+        return shorts
+    if name == "long":
+        return longs
+    # Long files go first so the short clips queue up behind bulk work.
+    return longs + shorts
+
+
+def lookup(report, dotted):
+    value = report
+    for key in dotted.split("."):
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+
+def compare(current, baseline, max_regression):
+    """Print a per-metric diff and return the regressions beyond the limit."""
+    out = sys.stderr
+    if current["corpus"]["digest"] != baseline["corpus"]["digest"]:
+        print("warning: corpus differs from the baseline; numbers are not comparable", file=out)
+    regressions = []
+    print(f"\n{'scenario':<8} {'metric':<20} {'baseline':>12} {'current':>12} {'change':>9}",
+          file=out)
+    for scenario, report in current["scenarios"].items():
+        base = baseline["scenarios"].get(scenario)
+        if base is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = lookup(base, metric), lookup(report, metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            worse = -change if higher_is_better else change
+            flag = ""
+            if max_regression is not None and worse > max_regression:
+                flag = "  REGRESSION"
+                regressions.append(f"{scenario} {metric} {change:+.1f}%")
+            print(f"{scenario:<8} {metric:<20} {old:>12} {new:>12} {change:>+8.1f}%{flag}",
+                  file=out)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:27245")
+    parser.add_argument("--scenarios", default="short,long,mixed",
+                        help="comma-separated subset of short, long, mixed")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--short-requests", type=int, default=48)
+    parser.add_argument("--short-clips", type=int, default=12)
+    parser.add_argument("--long-seconds", type=int, default=900,
+                        help="length of the long files; keep it above the server's "
+                             "WINDOWED_MIN_SECONDS (600) to exercise windowed decoding")
+    parser.add_argument("--long-repeats", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--corpus", default=os.path.join(os.path.dirname(__file__), "corpus"))
+    parser.add_argument("--timeout", type=float, default=1800)
+    parser.add_argument("--rss-interval", type=float, default=0.5)
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="compare against a previous report")
+    parser.add_argument("--max-regression", type=float,
+                        help="exit non-zero if a compared metric is this many percent worse")
+    args = parser.parse_args()
+
+    manifest = build_corpus(args.corpus, args.seed, args.short_clips, args.long_seconds)
+    with urllib.request.urlopen(f"{args.url}/health", timeout=10) as resp:
+        health = json.load(resp)
+
+    report = {
+        "version": REPORT_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "server": {"url": args.url, "health": health},
+        "config": {key: getattr(args, key) for key in
+                   ("scenarios", "concurrency", "short_requests", "long_repeats")},
+        "corpus": {"digest": manifest["digest"], **manifest["spec"]},
+        "scenarios": {},
+    }
+    for name in args.scenarios.split(","):
+        tasks = scenario_tasks(name, manifest, args.corpus,
+                               args.short_requests, args.long_repeats)
+        print(f"Running {name}: {len(tasks)} requests at concurrency {args.concurrency}",
+              file=sys.stderr)
+        report["scenarios"][name] = run_scenario(args.url, tasks, args.concurrency,
+                                                 args.timeout, args.rss_interval)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.max_regression)
+        if regressions:
+            print("\nRegressions: " + ", ".join(regressions), file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""Unit tests for app.py's pure helpers and in-memory stores.
+
+Run from this directory with ``python -m unittest test_app`` (or pytest).
+Importing app starts the model loader, so the ONNX packages are replaced by
+a recognizer that hears nothing, and every writable directory is moved
+into a temporary one; no model is downloaded or loaded.
+"""
+
+import concurrent.futures
+import io
+import os
+import sys
+import tempfile
+import time
+import types
+import unittest
+from unittest import mock
+
+import numpy as np
+
+_scratch = tempfile.mkdtemp(prefix="parakeet-test-")
+for _name in ("JOB_DIR", "CACHE_DIR", "PROFILE_DIR"):
+    os.environ[f"PARAKEET_{_name}"] = os.path.join(_scratch, _name.lower())
+os.environ["PARAKEET_GRAPH_CACHE_DIR"] = ""
+os.environ["PARAKEET_AUTOTUNE"] = "off"
+os.environ["PARAKEET_WORKER_PROCESSES"] = "0"
+
+
+class _SilentModel:
+    def with_timestamps(self):
+        return self
+
+    def recognize(self, batch):
+        return [types.SimpleNamespace(text="", tokens=[], timestamps=[]) for _ in batch]
+
+
+_ort = types.ModuleType("onnxruntime")
+_ort.__version__ = "test"
+_ort.SessionOptions = types.SimpleNamespace
+_ort.ExecutionMode = types.SimpleNamespace(ORT_SEQUENTIAL=0)
+_ort.GraphOptimizationLevel = types.SimpleNamespace(ORT_DISABLE_ALL=0, ORT_ENABLE_ALL=99)
+_asr = types.ModuleType("onnx_asr")
+_asr.load_model = lambda *args, **kwargs: _SilentModel()
+sys.modules["onnxruntime"] = _ort
+sys.modules["onnx_asr"] = _asr
+
+import app  # noqa: E402
+
+
+def transcript(words, offset=0.0):
+    """A Transcript of one-token ``(word, start)`` pairs, ``offset`` seconds in."""
+    tokens = [f"▁{word}" for word, _ in words]
+    result = app.RecognitionResult("".join(tokens), tokens, [start for _, start in words])
+    return app.Transcript.from_result(result, offset)
+
+
+def words_of(piece):
+    return [] if piece is None else list(piece.words()[0])
+
+
+class MergeOverlapsTest(unittest.TestCase):
+    def merge(self, chunks):
+        with mock.patch.object(app, "CHUNK_OVERLAP_SECONDS", 4.0):
+            return list(app.merge_overlaps(chunk for chunk in chunks))
+
+    def test_overlap_cut_picks_longest_pause_near_boundary(self):
+        previous = transcript([("a", 7.0), ("b", 8.0), ("c", 9.5), ("d", 10.8)])
+        with mock.patch.object(app, "CHUNK_OVERLAP_SECONDS", 4.0):
+            self.assertAlmostEqual(app.overlap_cut(previous, 10.0), 10.15)
+            self.assertEqual(app.overlap_cut(previous, 20.0), 20.0)
+            self.assertEqual(app.overlap_cut(None, 10.0), 10.0)
+
+    def test_words_in_the_overlap_are_kept_once(self):
+        first = transcript([("a", 7.0), ("b", 8.0), ("c", 9.5), ("d", 10.8)])
+        second = transcript([("c", 3.5), ("d", 4.8), ("e", 6.0)], offset=6.0)
+        merged = self.merge([(0.0, first), (10.0, second)])
+        self.assertEqual([words_of(piece) for piece in merged],
+                         [["a", "b", "c"], ["d", "e"]])
+
+    def test_cut_never_moves_back(self):
+        first = transcript([("a", 0.5), ("b", 9.0), ("c", 10.6)])
+        # A short middle chunk whose own pauses sit before the previous cut.
+        middle = transcript([("c", 4.6), ("x", 5.0)], offset=6.0)
+        last = transcript([("x", 1.0), ("y", 2.5)], offset=10.0)
+        merged = self.merge([(0.0, first), (10.0, middle), (11.0, last)])
+        flat = [word for piece in merged for word in words_of(piece)]
+        self.assertEqual(flat, ["a", "b", "c", "x", "y"])
+
+    def test_empty_chunks_pass_through(self):
+        only = transcript([("a", 1.0)], offset=10.0)
+        self.assertEqual([words_of(piece) for piece in self.merge([(0.0, None), (10.0, only)])],
+                         [[], ["a"]])
+
+    def test_without_overlap_chunks_are_untouched(self):
+        pieces = [transcript([("a", 1.0)]), transcript([("b", 1.0)], offset=10.0)]
+        with mock.patch.object(app, "CHUNK_OVERLAP_SECONDS", 0.0):
+            merged = app.merge_overlaps(chunk for chunk in zip((0.0, 10.0), pieces))
+            self.assertEqual(list(merged), pieces)
+
+
+class GateSpeechTest(unittest.TestCase):
+    @staticmethod
+    def tone(seconds):
+        t = np.arange(int(seconds * app.SAMPLE_RATE)) / app.SAMPLE_RATE
+        return (0.5 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+    def test_long_silence_is_cut_and_timestamps_map_back(self):
+        samples = np.concatenate([self.tone(2), np.zeros(3 * app.SAMPLE_RATE, np.float32),
+                                  self.tone(2)])
+        gated, timeline = app.gate_speech(samples)
+        padding = app.VAD_PADDING
+        self.assertAlmostEqual(len(gated) / app.SAMPLE_RATE, 7 - (3 - 2 * padding), places=1)
+        np.testing.assert_allclose(
+            timeline.to_original([0.5, 2 + padding + 0.5]), [0.5, 5 - padding + 0.5], atol=0.02)
+
+    def test_audio_without_long_silence_is_unchanged(self):
+        samples = self.tone(3)
+        gated, timeline = app.gate_speech(samples)
+        self.assertIs(gated, samples)
+        self.assertIsNone(timeline)
+
+    def test_timeline_maps_each_kept_span(self):
+        timeline = app.SpeechTimeline(np.array([0.0, 2.0]), np.array([0.0, 5.0]))
+        np.testing.assert_allclose(timeline.to_original([0.0, 1.9, 2.0, 3.5]),
+                                   [0.0, 1.9, 5.0, 6.5])
+
+
+class UploadDigestTest(unittest.TestCase):
+    def digest(self, data=b"audio", pcm_format=None):
+        return app.upload_digest(io.BytesIO(data), pcm_format)
+
+    def test_same_upload_same_key_and_stream_rewound(self):
+        stream = io.BytesIO(b"audio")
+        self.assertEqual(app.upload_digest(stream), self.digest())
+        self.assertEqual(stream.read(), b"audio")
+
+    def test_key_covers_content_and_pcm_format(self):
+        self.assertNotEqual(self.digest(b"audio"), self.digest(b"other"))
+        self.assertNotEqual(self.digest(pcm_format=("s16le", 16000, 1)),
+                            self.digest(pcm_format=("s16le", 8000, 1)))
+        self.assertNotEqual(self.digest(), self.digest(pcm_format=("s16le", 16000, 1)))
+
+    def test_key_covers_speech_gating(self):
+        base = self.digest()
+        with mock.patch.object(app, "VAD_GATING", not app.VAD_GATING):
+            self.assertNotEqual(self.digest(), base)
+
+    def test_key_covers_chunk_length_and_overlap(self):
+        base = self.digest()
+        for setting, value in (("CHUNK_SECONDS", app.CHUNK_SECONDS + 30),
+                               ("CHUNK_OVERLAP_SECONDS", app.CHUNK_OVERLAP_SECONDS + 2)):
+            with self.subTest(setting=setting), mock.patch.object(app, setting, value):
+                self.assertNotEqual(self.digest(), base)
+
+
+class TranscriptCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp(dir=_scratch)
+        self.entry = transcript([("hello", 0.0), ("world", 0.5)])
+        self.size = len(app.json.dumps(self.entry.to_dict()))
+
+    def cache(self, memory_bytes=10**6, disk_bytes=10**6, max_age=3600, read_only=False):
+        return app.TranscriptCache(memory_bytes, self.dir, disk_bytes, max_age, read_only)
+
+    def files(self):
+        return sorted(os.listdir(self.dir))
+
+    def test_memory_evicts_least_recently_used(self):
+        cache = app.TranscriptCache(2 * self.size, None, 0, 3600)
+        cache.put("a", self.entry)
+        cache.put("b", self.entry)
+        cache.get("a")
+        cache.put("c", self.entry)
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["memory_entries"], 2)
+
+    def test_disk_entries_survive_a_restart(self):
+        self.cache().put("a", self.entry)
+        restarted = self.cache(memory_bytes=0)
+        self.assertEqual(restarted.get("a").text, self.entry.text)
+        self.assertEqual(restarted.stats()["disk_hits"], 1)
+
+    def test_disk_evicts_least_recently_used_over_budget(self):
+        cache = self.cache(disk_bytes=2 * self.size)
+        for key in "abc":
+            cache.put(key, self.entry)
+        self.assertEqual(self.files(), ["b.json", "c.json"])
+
+    def test_disk_entries_expire_by_age(self):
+        cache = self.cache()
+        cache.put("a", self.entry)
+        cache.put("b", self.entry)
+        old = time.time() - 7200
+        os.utime(os.path.join(self.dir, "a.json"), (old, old))
+        restarted = self.cache(memory_bytes=0)
+        self.assertEqual(self.files(), ["b.json"])
+        restarted._disk["b"] = (restarted._disk["b"][0], old)
+        self.assertIsNone(restarted.get("b"))
+        self.assertEqual(self.files(), [])
+
+    def test_scan_keeps_young_temp_files(self):
+        young = os.path.join(self.dir, "a.json.1.tmp")
+        stale = os.path.join(self.dir, "b.json.2.tmp")
+        for path in (young, stale):
+            open(path, "w").close()
+        old = time.time() - 2 * app.CACHE_TEMP_GRACE_SECONDS
+        os.utime(stale, (old, old))
+        self.cache()
+        self.assertEqual(self.files(), ["a.json.1.tmp"])
+
+    def test_read_only_cache_reads_but_never_writes(self):
+        self.cache().put("a", self.entry)
+        open(os.path.join(self.dir, "b.json.1.tmp"), "w").close()
+        old = time.time() - 2 * app.CACHE_TEMP_GRACE_SECONDS
+        os.utime(os.path.join(self.dir, "b.json.1.tmp"), (old, old))
+        reader = self.cache(memory_bytes=0, read_only=True)
+        self.assertIsNotNone(reader.get("a"))
+        reader.put("c", self.entry)
+        self.assertEqual(self.files(), ["a.json", "b.json.1.tmp"])
+
+    def test_disk_tier_off_without_a_budget(self):
+        cache = self.cache(disk_bytes=0)
+        cache.put("a", self.entry)
+        self.assertEqual(self.files(), [])
+        self.assertEqual(cache.stats()["max_disk_bytes"], 0)
+
+
+class JobStoreTest(unittest.TestCase):
+    def test_lifecycle_and_fail_after_complete(self):
+        store = app.JobStore(3600, 10, 10**6)
+        store.create("j", "queued")
+        store.start("j")
+        self.assertEqual(store.get("j")["status"], "processing")
+        store.complete("j")
+        store.fail("j", "late disconnect")
+        job = store.get("j")
+        self.assertEqual((job["status"], job["progress_percent"]), ("complete", 100))
+        self.assertNotIn("error", job)
+
+    def test_partial_text_is_joined(self):
+        store = app.JobStore(3600, 10, 10**6)
+        store.create("j", "processing", total_chunks=2)
+        store.progress("j", 1, "hello")
+        store.progress("j", 2, "world")
+        job = store.get("j")
+        self.assertEqual((job["partial_text"], job["progress_percent"]), ("hello world", 100))
+
+    def test_oldest_finished_jobs_are_evicted_first(self):
+        store = app.JobStore(3600, 2, 10**6)
+        for job_id in "abc":
+            store.create(job_id, "processing")
+            store.complete(job_id)
+        self.assertIsNone(store.get("a"))
+        self.assertEqual(store.count("complete"), 2)
+
+    def test_results_are_bounded_by_bytes(self):
+        entry = transcript([("hello", 0.0)])
+        store = app.JobStore(3600, 10, entry.nbytes)
+        for job_id in "ab":
+            store.create(job_id, "processing")
+            store.complete(job_id, entry)
+        self.assertIsNone(store.result("a"))
+        self.assertIs(store.result("b"), entry)
+
+    def test_expired_jobs_are_evicted(self):
+        store = app.JobStore(0, 10, 10**6)
+        store.create("a", "processing")
+        store.fail("a", "boom")
+        time.sleep(0.01)
+        store.create("b", "queued")
+        self.assertIsNone(store.get("a"))
+        self.assertEqual(store.oldest("queued")[0], "b")
+
+
+class BatchSchedulerTest(unittest.TestCase):
+    def scheduler(self, max_batch=4, window=0.0):
+        return app.BatchScheduler(window, max_batch, 2.0, {"interactive": 4, "bulk": 4})
+
+    @staticmethod
+    def chunk(seconds=1.0):
+        return np.zeros(int(seconds * app.SAMPLE_RATE), np.float32)
+
+    def test_cancelled_chunks_are_skipped(self):
+        scheduler = self.scheduler()
+        futures = scheduler.submit_many([self.chunk(), self.chunk()], "bulk")
+        futures[0].cancel()
+        batch = scheduler._next_batch()
+        self.assertEqual([item.future for item in batch], [futures[1]])
+        self.assertTrue(futures[0].cancelled())
+        self.assertTrue(futures[1].running())
+
+    def test_requeued_chunks_are_not_cancelled_again(self):
+        scheduler = self.scheduler()
+        future = scheduler.submit(self.chunk())
+        batch = scheduler._next_batch()
+        scheduler._requeue(batch, app.WorkerLost("gone"))
+        self.assertEqual([item.future for item in scheduler._next_batch()], [future])
+
+    def test_interactive_chunks_run_first(self):
+        scheduler = self.scheduler()
+        scheduler.submit(self.chunk(), "bulk")
+        interactive = scheduler.submit(self.chunk(), "interactive")
+        self.assertEqual([item.future for item in scheduler._next_batch()], [interactive])
+
+    def test_full_queue_is_rejected(self):
+        scheduler = self.scheduler()
+        scheduler.submit_many([self.chunk()] * 3, "bulk")
+        with self.assertRaises(app.QueueFull):
+            scheduler.submit_many([self.chunk()] * 2, "bulk")
+
+    def test_chunks_of_very_different_length_are_not_batched(self):
+        scheduler = self.scheduler()
+        scheduler.submit_many([self.chunk(1.0), self.chunk(5.0)], "bulk")
+        self.assertEqual(len(scheduler._next_batch()), 1)
+        self.assertEqual(len(scheduler._next_batch()), 1)
+
+    def test_attached_model_resolves_futures(self):
+        scheduler = self.scheduler()
+        scheduler.start([_SilentModel()])
+        futures = scheduler.submit_many([self.chunk(), self.chunk()], "bulk")
+        results = [future.result(timeout=5) for future in futures]
+        self.assertEqual([result.text for result in results], ["", ""])
+        self.assertTrue(all(isinstance(future, concurrent.futures.Future) for future in futures))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -12,6 +12,7 @@ var { fetchLatestVersion, isNewer } = require("./updater");
 var { fetchUsageData } = require("./usage");
 var { execFileSync } = require("child_process");
 var { log } = require("./log");
+var WebSocket = require("ws");
 
 // SDK loaded dynamically (ESM module)
 var sdkModule = null;
@@ -51,6 +52,7 @@ var MIME_TYPES = {
 
 // --- Voice proxy config ---
 var STT_URL = process.env.BRAIGI_STT_URL || "http://localhost:27245";
+var STT_STREAM_URL = process.env.BRAIGI_STT_STREAM_URL || "ws://localhost:27247";
 var TTS_URL = process.env.BRAIGI_TTS_URL || "http://localhost:27246";
 var STT_MODEL = process.env.BRAIGI_STT_MODEL || "parakeet";
 var TTS_MODEL = process.env.BRAIGI_TTS_MODEL || "speaches-ai/Kokoro-82M-v1.0-ONNX";
@@ -1014,6 +1016,7 @@ function createProjectContext(opts) {
     handleMessage: handleMessage,
     handleDisconnection: handleDisconnection,
     handleHTTP: handleHTTP,
+    handleSttStream: proxySTTStream,
     getStatus: getStatus,
     setTitle: setTitle,
     warmup: function () { sdk.warmup(); },
@@ -1081,6 +1084,12 @@ function collectRawBody(req, maxSize) {
 function proxySTT(req, res) {
   collectRawBody(req, VOICE_MAX_BODY).then(function (audioData) {
     var contentType = req.headers["content-type"] || "audio/webm";
+    // Pre-decoded PCM (audio/L16, audio/pcm) goes through as the raw body so
+    // Parakeet can skip ffmpeg; options travel in the query string
+    if (/^audio\/(l16|pcm)\b/i.test(contentType)) {
+      sendSTT(res, "/v1/audio/transcriptions?priority=interactive", contentType, audioData);
+      return;
+    }
     var ext = "webm";
     if (contentType.indexOf("ogg") >= 0) ext = "ogg";
     else if (contentType.indexOf("wav") >= 0) ext = "wav";
@@ -1102,58 +1111,116 @@ function proxySTT(req, res) {
       "Content-Disposition: form-data; name=\"model\"\r\n\r\n" +
       STT_MODEL + "\r\n"
     );
+    // Mic clips are latency-sensitive; let Parakeet schedule them ahead of bulk jobs
+    var priorityPart = Buffer.from(
+      "--" + boundary + "\r\n" +
+      "Content-Disposition: form-data; name=\"priority\"\r\n\r\n" +
+      "interactive\r\n"
+    );
     var closer = Buffer.from("--" + boundary + "--\r\n");
-    var body = Buffer.concat([filePart, modelPart, closer]);
+    var body = Buffer.concat([filePart, modelPart, priorityPart, closer]);
+    sendSTT(res, "/v1/audio/transcriptions", "multipart/form-data; boundary=" + boundary, body);
+  }).catch(function (err) {
+    res.writeHead(400, { "Content-Type": "application/json" });
+    res.end(JSON.stringify({ error: err.message }));
+  });
+}
 
-    var parsed = new URL(STT_URL);
-    var isHttps = parsed.protocol === "https:";
-    var options = {
-      hostname: parsed.hostname,
-      port: parsed.port || (isHttps ? 443 : 80),
-      path: "/v1/audio/transcriptions",
-      method: "POST",
-      headers: {
-        "Content-Type": "multipart/form-data; boundary=" + boundary,
-        "Content-Length": body.length,
-      },
-      timeout: 120000,
-    };
+// POST an upload to Parakeet and relay its JSON answer
+function sendSTT(res, path, contentType, body) {
+  var parsed = new URL(STT_URL);
+  var isHttps = parsed.protocol === "https:";
+  var options = {
+    hostname: parsed.hostname,
+    port: parsed.port || (isHttps ? 443 : 80),
+    path: path,
+    method: "POST",
+    headers: {
+      "Content-Type": contentType,
+      "Content-Length": body.length,
+    },
+    timeout: 120000,
+  };
 
-    var proxyReq = (isHttps ? https : http).request(options, function (proxyRes) {
-      var chunks = [];
-      proxyRes.on("data", function (c) { chunks.push(c); });
-      proxyRes.on("end", function () {
-        var respBody = Buffer.concat(chunks).toString();
-        res.writeHead(proxyRes.statusCode, { "Content-Type": "application/json" });
-        res.end(respBody);
-      });
+  var proxyReq = (isHttps ? https : http).request(options, function (proxyRes) {
+    var chunks = [];
+    proxyRes.on("data", function (c) { chunks.push(c); });
+    proxyRes.on("end", function () {
+      var respBody = Buffer.concat(chunks).toString();
+      var headers = { "Content-Type": "application/json" };
+      if (proxyRes.headers["retry-after"]) headers["Retry-After"] = proxyRes.headers["retry-after"];
+      res.writeHead(proxyRes.statusCode, headers);
+      res.end(respBody);
     });
+  });
 
-    proxyReq.on("error", function (err) {
-      log("voice:stt", "backend error: " + err.message);
-      if (!res.headersSent) {
-        res.writeHead(502, { "Content-Type": "application/json" });
-        res.end(JSON.stringify({ error: "STT backend unavailable: " + err.message }));
-      } else {
-        res.end();
-      }
-    });
+  proxyReq.on("error", function (err) {
+    log("voice:stt", "backend error: " + err.message);
+    if (!res.headersSent) {
+      res.writeHead(502, { "Content-Type": "application/json" });
+      res.end(JSON.stringify({ error: "STT backend unavailable: " + err.message }));
+    } else {
+      res.end();
+    }
+  });
 
-    proxyReq.on("timeout", function () {
-      log("voice:stt", "backend timeout");
-      proxyReq.destroy();
-      if (!res.headersSent) {
-        res.writeHead(504, { "Content-Type": "application/json" });
-        res.end(JSON.stringify({ error: "STT backend timeout" }));
-      } else {
-        res.end();
-      }
-    });
+  proxyReq.on("timeout", function () {
+    log("voice:stt", "backend timeout");
+    proxyReq.destroy();
+    if (!res.headersSent) {
+      res.writeHead(504, { "Content-Type": "application/json" });
+      res.end(JSON.stringify({ error: "STT backend timeout" }));
+    } else {
+      res.end();
+    }
+  });
 
-    proxyReq.end(body);
-  }).catch(function (err) {
-    res.writeHead(400, { "Content-Type": "application/json" });
-    res.end(JSON.stringify({ error: err.message }));
+  proxyReq.end(body);
+}
+
+// Relay a live mic stream to Parakeet's realtime endpoint and its
+// partial/final transcripts back. Frames that arrive before the backend
+// socket is open are buffered and flushed on open.
+function proxySTTStream(clientWs, reqUrl) {
+  var params = new URL(reqUrl, "http://localhost").searchParams;
+  var query = new URLSearchParams();
+  ["format", "sample_rate"].forEach(function (key) {
+    if (params.has(key)) query.set(key, params.get(key));
+  });
+  var pending = [];
+  var upstream = new WebSocket(STT_STREAM_URL + "/v1/audio/transcriptions/stream?" + query.toString());
+
+  upstream.on("open", function () {
+    pending.forEach(function (m) { upstream.send(m.data, { binary: m.binary }); });
+    pending = [];
+  });
+
+  upstream.on("message", function (data, isBinary) {
+    if (clientWs.readyState === WebSocket.OPEN) clientWs.send(data, { binary: isBinary });
+  });
+
+  upstream.on("close", function () {
+    if (clientWs.readyState === WebSocket.OPEN) clientWs.close();
+  });
+
+  upstream.on("error", function (err) {
+    log("voice:stt", "stream backend error: " + err.message);
+    if (clientWs.readyState === WebSocket.OPEN) clientWs.close(1011, "STT backend unavailable");
+  });
+
+  clientWs.on("message", function (data, isBinary) {
+    if (upstream.readyState === WebSocket.OPEN) {
+      upstream.send(data, { binary: isBinary });
+    } else if (upstream.readyState === WebSocket.CONNECTING) {
+      pending.push({ data: data, binary: isBinary });
+    }
+  });
+
+  clientWs.on("close", function () {
+    pending = [];
+    if (upstream.readyState === WebSocket.OPEN || upstream.readyState === WebSocket.CONNECTING) {
+      upstream.terminate();
+    }
   });
 }
 
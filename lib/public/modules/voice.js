@@ -11,6 +11,12 @@ var recording = false;
 var mediaRecorder = null;
 var audioChunks = [];
 var transcribing = false;
+var sttStream = null;
+var sttInterimBase = null; // input text from before interim results were shown
+var STT_STREAM_TIMESLICE = 250;
+var STT_FINAL_TIMEOUT = 10000;
+var STT_PCM_RATE = 16000;
+var STT_PCM_MAX_BYTES = 10 * 1024 * 1024; // relay's VOICE_MAX_BODY; PCM16 is ~32KB/s
 var audioContext = null;
 var analyser = null;
 var waveformRaf = null;
@@ -288,24 +294,30 @@ function startRecording() {
     }
     var options = mimeType ? { mimeType: mimeType } : {};
     mediaRecorder = new MediaRecorder(stream, options);
+    sttStream = openSttStream(mediaRecorder.mimeType || mimeType);
 
     mediaRecorder.ondataavailable = function (e) {
-      if (e.data.size > 0) audioChunks.push(e.data);
+      if (e.data.size > 0) {
+        audioChunks.push(e.data);
+        if (sttStream && sttStream.readyState === WebSocket.OPEN) sttStream.send(e.data);
+      }
     };
 
     mediaRecorder.onstop = function () {
       stream.getTracks().forEach(function (t) { t.stop(); });
       stopWaveformAnimation();
       if (audioChunks.length === 0) {
+        closeSttStream();
         micBtn.classList.remove("recording");
         return;
       }
       var blob = new Blob(audioChunks, { type: mediaRecorder.mimeType || "audio/webm" });
-      transcribeAudio(blob);
+      finishSttStream(blob);
     };
 
-    // Record continuously — no interim transcription, just collect audio
-    mediaRecorder.start();
+    // Stream short slices so the backend transcribes while the user speaks;
+    // the collected chunks double as the upload if streaming is unavailable
+    mediaRecorder.start(STT_STREAM_TIMESLICE);
   }).catch(function (err) {
     recording = false;
     micBtn.classList.remove("recording");
@@ -325,13 +337,149 @@ function stopRecording() {
   }
 }
 
-function transcribeAudio(blob) {
-  transcribing = true;
+// --- Realtime STT stream (falls back to a full upload on any failure) ---
+
+function openSttStream(mimeType) {
+  var format = mimeType.indexOf("webm") >= 0 ? "webm" : mimeType.indexOf("ogg") >= 0 ? "ogg" : null;
+  if (!format || typeof WebSocket === "undefined") return null;
+  var protocol = location.protocol === "https:" ? "wss:" : "ws:";
+  var ws;
+  try {
+    ws = new WebSocket(protocol + "//" + location.host + basePath + "api/stt/stream?format=" + format);
+  } catch (e) {
+    return null;
+  }
+  ws.finalText = null;
+  ws.failed = false;
+  ws.onopen = function () {
+    // Catch up on slices recorded while the socket was connecting
+    audioChunks.forEach(function (chunk) { ws.send(chunk); });
+  };
+  ws.onmessage = function (e) {
+    var msg;
+    try { msg = JSON.parse(e.data); } catch (err) { return; }
+    if (msg.type === "partial") {
+      if (ws === sttStream) showInterimTranscript(msg.text || "");
+    } else if (msg.type === "final") {
+      ws.finalText = msg.text || "";
+      if (ws.onfinal) ws.onfinal();
+    } else if (msg.type === "error") {
+      ws.failed = true;
+    }
+  };
+  ws.onerror = function () { ws.failed = true; };
+  ws.onclose = function () {
+    if (ws.finalText === null) ws.failed = true;
+    if (ws.onfinal) ws.onfinal();
+  };
+  return ws;
+}
+
+function closeSttStream() {
+  if (!sttStream) return;
+  var ws = sttStream;
+  sttStream = null;
+  ws.onfinal = null;
+  try { ws.close(); } catch (e) {}
+}
+
+function finishSttStream(blob) {
+  var ws = sttStream;
+  if (!ws || ws.failed || ws.readyState !== WebSocket.OPEN) {
+    closeSttStream();
+    transcribeAudio(blob);
+    return;
+  }
+  setTranscribing(true);
+  var settled = false;
+  var timer = setTimeout(function () { settle(); }, STT_FINAL_TIMEOUT);
+  function settle() {
+    if (settled) return;
+    settled = true;
+    clearTimeout(timer);
+    var text = ws.finalText;
+    closeSttStream();
+    if (text === null) {
+      console.warn("[STT] Stream ended without a final result, uploading recording");
+      transcribeAudio(blob);
+      return;
+    }
+    setTranscribing(false);
+    applyTranscript(text);
+  }
+  ws.onfinal = settle;
+  ws.send(JSON.stringify({ type: "end" }));
+  if (ws.finalText !== null || ws.failed) settle();
+}
+
+function setTranscribing(on) {
+  transcribing = on;
   micBtn.classList.remove("recording");
-  micBtn.classList.add("transcribing");
+  micBtn.classList.toggle("transcribing", on);
+  if (!on) clearInterimTranscript();
+}
+
+// Show the live hypothesis in the input while the user is still speaking
+function showInterimTranscript(text) {
+  if (sttInterimBase === null) sttInterimBase = inputEl.value;
+  inputEl.value = text;
+  inputEl.dispatchEvent(new Event("input"));
+}
+
+// Put back what the input held before, ahead of the final result or on failure
+function clearInterimTranscript() {
+  if (sttInterimBase === null) return;
+  inputEl.value = sttInterimBase;
+  sttInterimBase = null;
+  inputEl.dispatchEvent(new Event("input"));
+}
+
+function applyTranscript(raw) {
+  var text = (raw || "").trim();
+  if (!text) { console.warn("[STT] Empty transcription result"); return; }
 
+  // Final transcription replaces any interim text
+  console.log("[STT] Got " + text.length + " chars");
+  inputEl.value = text;
+  inputEl.dispatchEvent(new Event("input"));
+  inputEl.focus();
+}
+
+// Decode the recording to 16 kHz mono PCM16 so the backend can feed it to the
+// model without an ffmpeg transcode; rejects if the browser cannot decode it
+// or the PCM would exceed the relay's body limit (~5 minutes)
+function recordingToPcm(blob) {
+  var Ctx = window.OfflineAudioContext || window.webkitOfflineAudioContext;
+  if (!Ctx || !blob.arrayBuffer) return Promise.reject(new Error("OfflineAudioContext unavailable"));
+  return blob.arrayBuffer().then(function (buf) {
+    // decodeAudioData resamples to the context's rate
+    return new Ctx(1, 1, STT_PCM_RATE).decodeAudioData(buf);
+  }).then(function (audio) {
+    if (audio.length * 2 > STT_PCM_MAX_BYTES) throw new Error("recording too long for PCM upload");
+    var channels = [];
+    for (var c = 0; c < audio.numberOfChannels; c++) channels.push(audio.getChannelData(c));
+    var pcm = new Int16Array(audio.length);
+    for (var i = 0; i < audio.length; i++) {
+      var sum = 0;
+      for (var j = 0; j < channels.length; j++) sum += channels[j][i];
+      var v = Math.max(-1, Math.min(1, sum / channels.length));
+      pcm[i] = v < 0 ? v * 32768 : v * 32767;
+    }
+    return new Blob([pcm.buffer], { type: "audio/L16;rate=" + STT_PCM_RATE });
+  });
+}
+
+function transcribeAudio(blob) {
+  setTranscribing(true);
+  recordingToPcm(blob).catch(function (err) {
+    console.warn("[STT] Uploading encoded recording, PCM decode failed:", err);
+    return blob;
+  }).then(uploadRecording);
+}
+
+function uploadRecording(blob) {
   var blobSizeMB = (blob.size / 1048576).toFixed(1);
-  console.log("[STT] Final transcription: " + blobSizeMB + "MB blob");
+  console.log("[STT] Final transcription: " + blobSizeMB + "MB " + (blob.type || "audio/webm"));
   fetch(basePath + "api/stt", {
     method: "POST",
     headers: { "Content-Type": blob.type || "audio/webm" },
@@ -345,23 +493,14 @@ function transcribeAudio(blob) {
     }
     return r.json();
   }).then(function (data) {
-    transcribing = false;
-    micBtn.classList.remove("transcribing");
+    setTranscribing(false);
     if (data.error) {
       console.error("[STT] Transcription error:", data.error);
       return;
     }
-    var text = (data.text || "").trim();
-    if (!text) { console.warn("[STT] Empty transcription result"); return; }
-
-    // Final transcription replaces any interim text
-    console.log("[STT] Got " + text.length + " chars");
-    inputEl.value = text;
-    inputEl.dispatchEvent(new Event("input"));
-    inputEl.focus();
+    applyTranscript(data.text);
   }).catch(function (err) {
-    transcribing = false;
-    micBtn.classList.remove("transcribing");
+    setTranscribing(false);
     console.error("[STT] Request failed:", err);
   });
 }
@@ -558,6 +697,8 @@ function cancelRecording() {
   if (!recording) return;
   recording = false;
   audioChunks = []; // prevent onstop from triggering transcribeAudio
+  closeSttStream();
+  clearInterimTranscript();
   if (navigator.vibrate) navigator.vibrate(30);
   stopWaveformAnimation();
   if (mediaRecorder && mediaRecorder.state === "recording") {
@@ -572,6 +713,7 @@ function resetVoiceState() {
   if (recording) {
     recording = false;
     audioChunks = [];
+    closeSttStream();
     stopWaveformAnimation();
     if (mediaRecorder && mediaRecorder.state === "recording") {
       try { mediaRecorder.stop(); } catch (e) {}
@@ -579,6 +721,7 @@ function resetVoiceState() {
   }
   // Clear stuck transcribing flag
   transcribing = false;
+  sttInterimBase = null;
   if (micBtn) {
     micBtn.classList.remove("recording");
     micBtn.classList.remove("transcribing");
@@ -326,6 +326,15 @@ function createServer(opts) {
       return;
     }
 
+    // Live mic stream: relayed to the STT backend instead of the project socket
+    if (/\/api\/stt\/stream$/.test(req.url.split("?")[0])) {
+      wss.handleUpgrade(req, socket, head, function (ws) {
+        log("ws", "stt stream slug=" + wsSlug);
+        ctx.handleSttStream(ws, req.url);
+      });
+      return;
+    }
+
     wss.handleUpgrade(req, socket, head, function (ws) {
       wss.emit("connection", ws, req);
       log("ws", "connected slug=" + wsSlug + " ip=" + (req.headers["x-forwarded-for"] || req.socket.remoteAddress));